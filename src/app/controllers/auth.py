@@ -1,7 +1,12 @@
+import time
+
 from app.controllers import users
 from app.libs.crypt import crypt
 from app.libs.crypt.crypt import DecodeTokenError
+from app.libs.crypt.hasher import get_hasher
 from app.libs.crypt.schemas import Token, TokenData
+from app.libs.crypt.token_cache import get_token_cache
+from app.libs.metrics.instrumentation import observe_jwt_decode
 from app.schemas.users import LoginUserData, User
 from app.services.db_interface import DBInterface
 from app.settings import settings
@@ -16,38 +21,86 @@ async def login_user(login_attempt: LoginUserData, users_interface: DBInterface)
 
 
 async def authenticate_user(login_attempt: LoginUserData, users_interface: DBInterface) -> User:
-    """Authenticate user against users service"""
+    """
+    Authenticate user against users service.
+    Passwords hashed with stale settings are rehashed and stored on success.
+    """
 
     user_db: DBUser = await users_interface.read_by_field("email", login_attempt.email)
     if not user_db:
         raise UserNotCorrectlyAuthenticatedError
 
-    passwords_match = crypt.verify_password(login_attempt.password, str(user_db.password))
+    passwords_match, new_password_hash = await get_hasher().verify_and_update_password(
+        login_attempt.password, str(user_db.password)
+    )
     if not passwords_match:
         raise UserNotCorrectlyAuthenticatedError
 
+    if new_password_hash:
+        await users_interface.update(user_db.id, {"password": new_password_hash}, ["id"])
+
     return User.from_orm(user_db)
 
 
 def encode_user_into_jwt_token(user: User) -> Token:
-    """Encodes a user public data into a standard JWT token"""
+    """
+    Encodes a user public data into a standard JWT token.
+    In stateless mode the profile and role are signed into a short lived token too.
+    """
+
+    if not settings.stateless_auth:
+        return crypt.create_access_token(
+            {"sub": str(user.id)},
+            settings.access_token_expire_minutes,
+            settings.secret_key,
+            settings.algorithm,
+        )
+
     return crypt.create_access_token(
-        {"sub": str(user.id)},
-        settings.access_token_expire_minutes,
+        {
+            "sub": str(user.id),
+            "name": user.name,
+            "email": user.email,
+            "role": user.role.value,
+            "ver": settings.token_claims_version,
+        },
+        settings.stateless_access_token_expire_minutes,
         settings.secret_key,
         settings.algorithm,
     )
 
 
-async def read_user_by_token(token: Token, users_interface: DBInterface) -> User:
-    """Returns user given JWT Token"""
+def decode_token(token: Token) -> TokenData:
+    """Returns the data of a JWT Token, skipping the verification of recently seen ones"""
+
+    token_cache = get_token_cache()
+    token_data = token_cache.get(str(token), settings.secret_key)
+    if token_data is not None:
+        return token_data
 
+    start = time.perf_counter()
     try:
-        token_data: TokenData = crypt.decode_access_token(
-            token, settings.secret_key, [settings.algorithm]
-        )
+        token_data = crypt.decode_access_token(token, settings.secret_key, [settings.algorithm])
     except DecodeTokenError as exception:
         raise CryptError from exception
+    finally:
+        observe_jwt_decode(time.perf_counter() - start)
+
+    token_cache.set(str(token), settings.secret_key, token_data)
+    return token_data
+
+
+async def read_user_by_token(token: Token, users_interface: DBInterface) -> User:
+    """
+    Returns user given JWT Token.
+    In stateless mode the user is built from the token claims when they are current.
+    """
+
+    token_data = decode_token(token)
+    if settings.stateless_auth and token_data.ver == settings.token_claims_version:
+        return User(
+            id=token_data.id, name=token_data.name, email=token_data.email, role=token_data.role
+        )
 
     return await users.read_by_id(token_data.id, users_interface)
 
@@ -1,57 +1,262 @@
-from typing import List
+import base64
+import binascii
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from uuid import UUID, uuid4
 
-from pydantic import EmailStr
+from app.libs.crypt.hasher import get_hasher
+from app.schemas.users import (
+    BulkCreateResult,
+    BulkDeleteResult,
+    CreateUserData,
+    Role,
+    UpdateUserData,
+    User,
+    UserConflict,
+    UsersFilter,
+    UsersPage,
+)
+from app.services.db_interface import ConflictError, DatabaseError, DBInterface
 
-from app.libs.crypt import crypt
-from app.schemas.users import CreateUserData, Role, User
-from app.services.db_interface import DatabaseError, DBInterface
-from app.storage.models import DBUser
+# Columns needed to serve a User, reading them alone skips the password hash
+USER_FIELDS = list(User.__fields__)
 
 
-async def read_all(requesting_user: User, users_interface: DBInterface) -> List[User]:
-    """Retrieves all users in the database"""
+async def read_page(
+    requesting_user: User,
+    users_filter: UsersFilter,
+    limit: int,
+    cursor: str | None,
+    users_interface: DBInterface,
+) -> UsersPage:
+    """Retrieves a page of users ordered by name, starting after the given cursor"""
 
     if requesting_user.role != Role.ADMIN:
         raise UserIsNotAuthorizedError
 
-    users_db = await users_interface.read_all()
-    users = []
-    for user in users_db:
-        users.append(User.from_orm(user))
-    return users
+    equal_to, starting_with = filter_conditions(users_filter)
+    users_db = await users_interface.read_page(
+        ["name", "id"],
+        limit + 1,
+        after=decode_cursor(cursor) if cursor else None,
+        equal_to=equal_to,
+        starting_with=starting_with,
+        fields=USER_FIELDS,
+    )
+    users = [User.construct(**user) for user in users_db[:limit]]
+
+    next_cursor = None
+    if len(users_db) > limit:
+        next_cursor = encode_cursor([users[-1].name, users[-1].id])
+    return UsersPage(users=users, next_cursor=next_cursor)
+
+
+def export_ndjson(
+    requesting_user: User,
+    users_filter: UsersFilter,
+    users_interface: DBInterface,
+    chunk_size: int = 500,
+) -> AsyncIterator[str]:
+    """
+    Streams every matching user as newline delimited JSON, grouping `chunk_size`
+    users per chunk. Authorization is checked before the stream starts.
+    """
+
+    if requesting_user.role != Role.ADMIN:
+        raise UserIsNotAuthorizedError
+
+    equal_to, starting_with = filter_conditions(users_filter)
+    users_db = users_interface.stream(
+        ["name", "id"], equal_to=equal_to, starting_with=starting_with, fields=USER_FIELDS
+    )
+    return _ndjson_chunks(users_db, chunk_size)
+
+
+async def _ndjson_chunks(users_db: AsyncIterator, chunk_size: int) -> AsyncIterator[str]:
+    lines = []
+    async for user_db in users_db:
+        lines.append(User.construct(**user_db).json())
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def filter_conditions(users_filter: UsersFilter) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Equality and prefix conditions matching a users filter"""
+
+    equal_to: Dict[str, Any] = {}
+    if users_filter.role:
+        equal_to["role"] = users_filter.role
+    starting_with = {}
+    if users_filter.email_prefix:
+        starting_with["email"] = users_filter.email_prefix
+    if users_filter.name_prefix:
+        starting_with["name"] = users_filter.name_prefix
+    return equal_to, starting_with
 
 
 async def read_by_id(user_id: UUID, users_interface: DBInterface) -> User:
     """Returns a user model given an user ID"""
 
-    user_db = await users_interface.read_by_id(user_id)
+    user_db = await users_interface.read_by_id(user_id, fields=USER_FIELDS)
     if not user_db:
         raise UserNotFoundError(user_id)
 
-    return User.from_orm(user_db)
+    return User.construct(**user_db)
 
 
 async def create(user_to_create: CreateUserData, users_interface: DBInterface) -> User:
-    """Creates a new user"""
+    """
+    Creates a new user with a single atomic insert.
+    Raises UserAlreadyExistsError with the clashing field when the email or name are taken.
+    """
+
+    user_data = user_to_create.dict()
+    user_data.update(id=uuid4(), password=await get_hasher().hash_password(user_to_create.password))
+    try:
+        user_db = await users_interface.create(user_data, USER_FIELDS)
+        if user_db:
+            return User.construct(**user_db)
+
+        conflicts = await users_interface.find_conflicts(user_data)
+    except DatabaseError as exception:
+        raise UnexpectedError from exception
+
+    field = conflicts[0] if conflicts else "email"
+    raise UserAlreadyExistsError(field, user_data[field])
+
+
+async def create_many(
+    requesting_user: User,
+    users_to_create: List[CreateUserData],
+    users_interface: DBInterface,
+    batch_size: int = 500,
+) -> BulkCreateResult:
+    """
+    Creates many users at once hashing their passwords in parallel.
+    Users whose name or email already exist are reported back instead of created.
+    """
+
+    if requesting_user.role != Role.ADMIN:
+        raise UserIsNotAuthorizedError
+
+    hashed_passwords = await get_hasher().hash_passwords(
+        [user.password for user in users_to_create]
+    )
+    users_data = [
+        {**user.dict(), "id": uuid4(), "password": hashed_password}
+        for user, hashed_password in zip(users_to_create, hashed_passwords)
+    ]
+    try:
+        created = await users_interface.create_many(users_data, ["id"], batch_size)
+    except DatabaseError as exception:
+        raise UnexpectedError from exception
+
+    created_ids = {user["id"] for user in created}
+    conflicts = [
+        UserConflict(index=index, name=user["name"], email=user["email"])
+        for index, user in enumerate(users_data)
+        if user["id"] not in created_ids
+    ]
+    return BulkCreateResult(created=len(created_ids), conflicts=conflicts)
+
 
-    if await users_interface.read_by_field("email", user_to_create.email):
-        raise UserAlreadyExistsError(user_to_create.email)
+async def update(
+    requesting_user: User,
+    user_id: UUID,
+    user_data: UpdateUserData,
+    users_interface: DBInterface,
+) -> User:
+    """
+    Updates only the fields present in user_data with a single statement.
+    Only admins can change roles.
+    """
+
+    values = user_data.dict(exclude_unset=True, exclude_none=True)
+    if "role" in values and requesting_user.role != Role.ADMIN:
+        raise UserIsNotAuthorizedError
+    if not values:
+        return await read_by_id(user_id, users_interface)
+    if "password" in values:
+        values["password"] = await get_hasher().hash_password(values["password"])
 
-    user_to_create.password = crypt.hash_password(user_to_create.password)
-    user_db = DBUser(id=uuid4(), **user_to_create.dict())
     try:
-        await users_interface.create(user_db)
+        user_db = await users_interface.update(user_id, values, USER_FIELDS)
+    except ConflictError as exception:
+        try:
+            conflicts = await users_interface.find_conflicts(values, exclude_id=user_id)
+        except DatabaseError as lookup_exception:
+            raise UnexpectedError from lookup_exception
+        field = conflicts[0] if conflicts else next(iter(values))
+        raise UserAlreadyExistsError(field, values[field]) from exception
     except DatabaseError as exception:
         raise UnexpectedError from exception
 
-    return User.from_orm(user_db)
+    if not user_db:
+        raise UserNotFoundError(user_id)
+    return User.construct(**user_db)
 
 
 async def delete(user_to_delete: User, users_interface: DBInterface) -> None:
     """Deletes user"""
-    await users_interface.read_by_id(user_to_delete.id)
-    await users_interface.delete(user_to_delete.id)
+
+    if not await users_interface.delete(user_to_delete.id):
+        raise UserNotFoundError(user_to_delete.id)
+
+
+async def delete_many(
+    requesting_user: User,
+    users_filter: UsersFilter,
+    excluded_names: List[str],
+    users_interface: DBInterface,
+) -> BulkDeleteResult:
+    """
+    Deletes every user matching the filter except the excluded ones and the requesting
+    user. At least one filter or exclusion is required so nobody wipes the table by mistake,
+    blank excluded names do not count.
+    """
+
+    if requesting_user.role != Role.ADMIN:
+        raise UserIsNotAuthorizedError
+
+    excluded_names = [name for name in excluded_names if name.strip()]
+    equal_to, starting_with = filter_conditions(users_filter)
+    if not (equal_to or starting_with or excluded_names):
+        raise MissingFilterError
+
+    try:
+        deleted = await users_interface.delete_many(
+            equal_to,
+            starting_with,
+            not_in={"id": [requesting_user.id], "name": excluded_names},
+        )
+    except DatabaseError as exception:
+        raise UnexpectedError from exception
+    return BulkDeleteResult(deleted=deleted)
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque cursor pointing to the position right after the given sorting values"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Sorting values of a cursor made by encode_cursor"""
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not (
+            isinstance(values, list)
+            and len(values) == 2
+            and all(isinstance(value, str) for value in values)
+        ):
+            raise ValueError("Cursors hold a name and an id")
+        name, user_id = values
+        return [name, UUID(user_id)]
+    except (binascii.Error, ValueError, TypeError) as exception:
+        raise InvalidCursorError(cursor) from exception
 
 
 class UnexpectedError(Exception):
@@ -62,6 +267,21 @@ class UserIsNotAuthorizedError(Exception):
     """User tries to access to a restricted section"""
 
 
+class MissingFilterError(Exception):
+    """Bulk operation requested without any filter"""
+
+
+class InvalidCursorError(Exception):
+    """Pagination cursor was not generated by this service"""
+
+    cursor: str
+
+    def __init__(self, cursor, *args: object) -> None:
+        super().__init__(*args)
+
+        self.cursor = cursor
+
+
 class UserNotFoundError(Exception):
     """User does not exist exception"""
 
@@ -74,11 +294,13 @@ class UserNotFoundError(Exception):
 
 
 class UserAlreadyExistsError(Exception):
-    """User already exists exception"""
+    """User already exists exception, field tells which unique value is taken"""
 
-    email: EmailStr
+    field: str
+    value: Any
 
-    def __init__(self, email, *args: object) -> None:
+    def __init__(self, field, value, *args: object) -> None:
         super().__init__(*args)
 
-        self.email = email
+        self.field = field
+        self.value = value
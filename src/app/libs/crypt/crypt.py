@@ -1,4 +1,6 @@
+import time
 from datetime import datetime, timedelta
+from typing import List, Tuple
 from uuid import UUID
 
 from jose import JWTError, jwt
@@ -6,19 +8,77 @@ from passlib.context import CryptContext
 
 from .schemas import Token, TokenData
 
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 16
 
-def __get_pwd_context() -> CryptContext:
-    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def configure_pwd_context(bcrypt_rounds: int | None = None) -> None:
+    """
+    Hashes new passwords with the given bcrypt cost and flags cheaper hashes as
+    stale. Costlier ones are kept, so workers calibrated to different costs do not
+    keep rehashing each other's hashes. Without a cost the passlib defaults are restored.
+    """
+
+    config: dict = {"schemes": ["bcrypt"], "deprecated": "auto"}
+    if bcrypt_rounds:
+        config.update(
+            bcrypt__default_rounds=bcrypt_rounds,
+            bcrypt__min_rounds=bcrypt_rounds,
+        )
+    pwd_context.load(config)
+
+
+def warm_up() -> None:
+    """Loads the bcrypt backend through a cheap hash, so no request pays for it"""
+    pwd_context.handler("bcrypt").using(rounds=MIN_BCRYPT_ROUNDS).hash("warm-up")  # type: ignore
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = MIN_BCRYPT_ROUNDS) -> int:
+    """
+    Highest bcrypt cost whose hash fits in the target latency on this hardware,
+    never lower than min_rounds. Each extra round doubles the hashing time.
+    """
+
+    rounds = max(min_rounds, MIN_BCRYPT_ROUNDS)
+    elapsed_ms = _time_bcrypt_hash(rounds)
+    while rounds < MAX_BCRYPT_ROUNDS and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms = _time_bcrypt_hash(rounds)
+    return rounds
+
+
+def _time_bcrypt_hash(rounds: int) -> float:
+    handler = pwd_context.handler("bcrypt").using(rounds=rounds)  # type: ignore
+    start = time.perf_counter()
+    handler.hash("calibration-password")
+    return (time.perf_counter() - start) * 1000
 
 
 def hash_password(password: str) -> str:
     """Hashes a plain text password"""
-    return __get_pwd_context().hash(password)
+    return pwd_context.hash(password)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hashes several plain text passwords"""
+    return [pwd_context.hash(password) for password in passwords]
 
 
 def verify_password(plain_text_password: str, hashed_password: str) -> bool:
     """Verifies if a plain text password matches a hashed one"""
-    return __get_pwd_context().verify(plain_text_password, hashed_password)
+    return pwd_context.verify(plain_text_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_text_password: str, hashed_password: str
+) -> Tuple[bool, str | None]:
+    """
+    Verifies a password and, when it matches a hash made with stale settings,
+    also returns a new hash made with the current ones
+    """
+    return pwd_context.verify_and_update(plain_text_password, hashed_password)
 
 
 def create_access_token(data: dict, min_expire: int, secret_key: str, algorithm: str) -> Token:
@@ -42,7 +102,14 @@ def decode_access_token(token: Token, secret_key, algorithms: list[str]) -> Toke
         if not user_id:
             raise DecodeTokenError
 
-        return TokenData(id=user_id)
+        return TokenData(
+            id=user_id,
+            exp=payload.get("exp"),
+            name=payload.get("name"),
+            email=payload.get("email"),
+            role=payload.get("role"),
+            ver=payload.get("ver"),
+        )
 
     except JWTError:
         raise DecodeTokenError from JWTError
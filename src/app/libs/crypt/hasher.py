@@ -0,0 +1,144 @@
+"""Password hashing off the event loop"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+from app.libs.metrics.instrumentation import observe_bcrypt
+
+from . import crypt
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a pool of threads or processes so that hashing never blocks the
+    event loop. At most `max_pending` hashes can be running or queued, further
+    ones are rejected straight away with HasherBusyError.
+
+    Workers hash with the given bcrypt cost, or with the passlib default.
+    Bulk hashing goes through in chunks of `bulk_chunk_size` passwords on at most
+    `bulk_workers` workers, by default all but one when there are more than two, so
+    logins and signups never wait behind a whole batch.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 32,
+        use_processes: bool = False,
+        bcrypt_rounds: int | None = None,
+        bulk_chunk_size: int = 8,
+        bulk_workers: int | None = None,
+    ):
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor: Executor = executor_class(
+            max_workers=workers,
+            initializer=crypt.configure_pwd_context,
+            initargs=(bcrypt_rounds,),
+        )
+        self.workers = workers
+        self.max_pending = max_pending
+        self.bulk_chunk_size = bulk_chunk_size
+        if bulk_workers is None:
+            bulk_workers = workers - 1 if workers > 2 else workers
+        self.bulk_workers = max(1, min(bulk_workers, workers))
+        self.pending = 0
+
+    async def hash_password(self, password: str) -> str:
+        """Hashes a plain text password"""
+        return await self._run(crypt.hash_password, password)
+
+    async def hash_passwords(self, passwords: List[str]) -> List[str]:
+        """
+        Hashes several plain text passwords in small chunks with at most one chunk in
+        flight per bulk worker. Other hashes are queued between chunks, so a large
+        batch only delays them by a chunk.
+        """
+
+        chunks = [
+            passwords[start : start + self.bulk_chunk_size]
+            for start in range(0, len(passwords), self.bulk_chunk_size)
+        ]
+        bulk_slots = asyncio.Semaphore(self.bulk_workers)
+
+        async def _hash_chunk(chunk: List[str]) -> List[str]:
+            async with bulk_slots:
+                return await self._run(crypt.hash_passwords, chunk)
+
+        hashed_chunks = await asyncio.gather(*(_hash_chunk(chunk) for chunk in chunks))
+        return [hashed_password for chunk in hashed_chunks for hashed_password in chunk]
+
+    async def verify_password(self, plain_text_password: str, hashed_password: str) -> bool:
+        """Verifies if a plain text password matches a hashed one"""
+        return await self._run(crypt.verify_password, plain_text_password, hashed_password)
+
+    async def verify_and_update_password(
+        self, plain_text_password: str, hashed_password: str
+    ) -> Tuple[bool, str | None]:
+        """Verifies a password and returns a new hash too when the stored one is stale"""
+        return await self._run(
+            crypt.verify_and_update_password, plain_text_password, hashed_password
+        )
+
+    async def warm_up(self) -> None:
+        """Starts every worker and loads bcrypt in them ahead of the first password"""
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, crypt.warm_up) for _ in range(self.workers))
+        )
+
+    async def _run(self, function: Callable, *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            raise HasherBusyError
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        finally:
+            self.pending -= 1
+            observe_bcrypt(time.perf_counter() - start)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hasher: PasswordHasher | None = None
+
+
+def init_hasher(
+    workers: int,
+    max_pending: int,
+    use_processes: bool = False,
+    bcrypt_rounds: int | None = None,
+    bulk_workers: int | None = None,
+) -> PasswordHasher:
+    """Replaces the shared hasher with a new one using the given pool"""
+
+    global _hasher  # pylint: disable=global-statement
+    shutdown_hasher()
+    _hasher = PasswordHasher(
+        workers, max_pending, use_processes, bcrypt_rounds, bulk_workers=bulk_workers
+    )
+    return _hasher
+
+
+def get_hasher() -> PasswordHasher:
+    """Returns the shared hasher, creating a default one if it was not initialised"""
+
+    global _hasher  # pylint: disable=global-statement
+    if _hasher is None:
+        _hasher = PasswordHasher()
+    return _hasher
+
+
+def shutdown_hasher() -> None:
+    global _hasher  # pylint: disable=global-statement
+    if _hasher is not None:
+        _hasher.shutdown()
+        _hasher = None
+
+
+class HasherBusyError(Exception):
+    """Too many passwords are already waiting to be hashed"""
@@ -1,4 +1,5 @@
 """JWT Models"""
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -15,3 +16,8 @@ class TokenData(BaseModel):
     """JWT Token Data Model"""
 
     id: UUID
+    exp: datetime | None = None
+    name: str | None = None
+    email: str | None = None
+    role: str | None = None
+    ver: int | None = None
@@ -0,0 +1,80 @@
+"""Cache of already verified JWTs"""
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from .schemas import TokenData
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens keyed by the raw token string.
+    Entries live until the token expires and the whole cache is dropped as soon
+    as it is used with a different secret key, so rotating the secret takes
+    effect immediately. A max_size of 0 disables caching.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, Tuple[TokenData, float]] = OrderedDict()
+        self.secret_key: str | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str, secret_key: str) -> TokenData | None:
+        """Returns the data of a cached token or None if it is unknown or expired"""
+
+        self._check_secret_key(secret_key)
+        entry = self.entries.get(token)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self.entries[token]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(token)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, token: str, secret_key: str, token_data: TokenData) -> None:
+        """Caches the data of a verified token until its expiration"""
+
+        if not self.max_size or token_data.exp is None:
+            return
+
+        self._check_secret_key(secret_key)
+        self.entries[token] = (token_data, token_data.exp.timestamp())
+        self.entries.move_to_end(token)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def statistics(self) -> dict:
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _check_secret_key(self, secret_key: str) -> None:
+        if secret_key != self.secret_key:
+            self.clear()
+            self.secret_key = secret_key
+
+
+_token_cache = TokenCache()
+
+
+def init_token_cache(max_size: int) -> TokenCache:
+    """Replaces the shared cache with an empty one of the given size"""
+
+    global _token_cache  # pylint: disable=global-statement
+    _token_cache = TokenCache(max_size)
+    return _token_cache
+
+
+def get_token_cache() -> TokenCache:
+    return _token_cache
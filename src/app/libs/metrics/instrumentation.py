@@ -0,0 +1,144 @@
+"""Request, database, bcrypt and JWT metrics of this process"""
+import time
+from contextvars import ContextVar
+from typing import Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import Counter, Gauge, Histogram, Registry
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(
+    Histogram(
+        "app_request_duration_seconds",
+        "Time to serve a request",
+        ("method", "route", "status"),
+    )
+)
+REQUESTS_IN_FLIGHT = registry.register(
+    Gauge("app_requests_in_flight", "Requests being served", ("method",))
+)
+REQUEST_DB_QUERIES = registry.register(
+    Histogram(
+        "app_request_db_queries",
+        "Database statements executed per request",
+        ("route",),
+        buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+    )
+)
+REQUEST_DB_SECONDS = registry.register(
+    Histogram("app_request_db_duration_seconds", "Database time per request", ("route",))
+)
+DB_QUERIES = registry.register(Counter("app_db_queries_total", "Database statements executed"))
+DB_SECONDS = registry.register(
+    Counter("app_db_query_seconds_total", "Time spent executing database statements")
+)
+BCRYPT_OPERATIONS = registry.register(
+    Counter("app_bcrypt_operations_total", "Password hashes and verifications")
+)
+BCRYPT_SECONDS = registry.register(
+    Counter(
+        "app_bcrypt_seconds_total",
+        "Time awaiting password hashes and verifications, waiting for a worker included",
+    )
+)
+JWT_DECODES = registry.register(Counter("app_jwt_decodes_total", "JWT signature verifications"))
+JWT_DECODE_SECONDS = registry.register(
+    Counter("app_jwt_decode_seconds_total", "Time spent verifying JWT signatures")
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetrics:
+    """Database usage accumulated while serving a single request"""
+
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def observe_db_query(seconds: float) -> None:
+    DB_QUERIES.inc()
+    DB_SECONDS.inc(seconds)
+    request_metrics = _current_request.get()
+    if request_metrics is not None:
+        request_metrics.db_queries += 1
+        request_metrics.db_seconds += seconds
+
+
+def observe_bcrypt(seconds: float) -> None:
+    BCRYPT_OPERATIONS.inc()
+    BCRYPT_SECONDS.inc(seconds)
+
+
+def observe_jwt_decode(seconds: float) -> None:
+    JWT_DECODES.inc()
+    JWT_DECODE_SECONDS.inc(seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request. Requests are labelled with the path
+    template of the route that served them, so ids in urls do not multiply series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        request_metrics = RequestMetrics()
+        token = _current_request.set(request_metrics)
+        in_flight_labels = (scope["method"],)
+        REQUESTS_IN_FLIGHT.inc(labels=in_flight_labels)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            REQUESTS_IN_FLIGHT.dec(labels=in_flight_labels)
+            route = route_template(scope)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start, (scope["method"], route, str(status))
+            )
+            REQUEST_DB_QUERIES.observe(request_metrics.db_queries, (route,))
+            REQUEST_DB_SECONDS.observe(request_metrics.db_seconds, (route,))
+
+
+_route_paths: Dict[object, str] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the endpoint routed to, known once the router has run"""
+
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    if endpoint not in _route_paths:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                _route_paths[endpoint] = route.path
+                break
+        else:
+            _route_paths[endpoint] = UNMATCHED_ROUTE
+    return _route_paths[endpoint]
@@ -0,0 +1,102 @@
+"""Sampled profiling of requests"""
+import asyncio
+import cProfile
+import hmac
+import os
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .instrumentation import route_template
+
+PROFILE_HEADER = "x-profile"
+PROFILE_SUFFIX = ".pstats"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware running cProfile over the requests carrying the secret in the
+    X-Profile header and over a random `sample_rate` share of the rest. Profiles are
+    written in the pstats format, readable by pstats, snakeviz or flameprof, into
+    `directory` named after the time, worker, method, route and request duration.
+    The oldest ones are removed once they take more than `max_bytes`.
+
+    cProfile follows the whole thread, so requests served concurrently show up
+    too, and only one request is profiled at a time.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        secret: str | None = None,
+        sample_rate: float = 0,
+        max_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.app = app
+        self.directory = Path(directory)
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.profiling or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.profiling = True
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profile.disable()
+        finally:
+            self.profiling = False
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        name = profile_name(scope["method"], route_template(scope), elapsed_ms)
+        await asyncio.get_running_loop().run_in_executor(None, self._save, profile, name)
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if not self.secret:
+            return False
+        header = Headers(scope=scope).get(PROFILE_HEADER)
+        # Header values are latin-1 decoded bytes, compare them as bytes so that
+        # non ASCII ones do not make compare_digest raise
+        return header is not None and hmac.compare_digest(
+            header.encode("latin-1"), self.secret.encode()
+        )
+
+    def _save(self, profile: cProfile.Profile, name: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(self.directory / name)
+        enforce_disk_cap(self.directory, self.max_bytes)
+
+
+def profile_name(method: str, route: str, elapsed_ms: float) -> str:
+    route_slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+    return f"{timestamp}-{os.getpid()}-{method}-{route_slug}-{elapsed_ms:.0f}ms{PROFILE_SUFFIX}"
+
+
+def enforce_disk_cap(directory: Path, max_bytes: int) -> None:
+    """Removes the oldest profiles until the rest fit in max_bytes"""
+
+    profiles = sorted(directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda path: path.stat().st_mtime)
+    total = sum(path.stat().st_size for path in profiles)
+    for path in profiles:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
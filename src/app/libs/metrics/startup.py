@@ -0,0 +1,28 @@
+"""Startup time of a worker"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StartupReport:
+    """Seconds taken by each step of the startup, in order, and by the whole of it"""
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+        self.started_at = time.perf_counter()
+        self.total = 0.0
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.started_at
+
+    def summary(self) -> str:
+        steps = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.steps.items())
+        return f"Started in {self.total * 1000:.1f}ms: {steps}"
@@ -0,0 +1,154 @@
+"""Token bucket rate limiting"""
+import time
+from typing import Dict, Protocol, Tuple
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    aioredis = None  # type: ignore
+
+
+class RateLimitBackend(Protocol):
+    """Store of token buckets"""
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        """
+        Takes a token from the bucket of the key, which holds up to capacity tokens
+        and regains refill_rate tokens per second. Returns 0 when a token was taken,
+        otherwise the seconds until one is available.
+        """
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class MemoryBackend:
+    """
+    Buckets kept in this process. A bucket that is full again is as good as a
+    missing one, so every sweep_interval seconds those are dropped and memory only
+    grows with the keys seen lately, however many a burst brings.
+    """
+
+    def __init__(self, sweep_interval: float = 60):
+        self.sweep_interval = sweep_interval
+        # key -> (tokens, updated at, full again at)
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+        self.next_sweep = time.monotonic() + sweep_interval
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.monotonic()
+        if now >= self.next_sweep:
+            self.sweep(now)
+
+        tokens = float(capacity)
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+
+        wait = 0.0
+        if tokens < 1:
+            wait = (1 - tokens) / refill_rate
+        else:
+            tokens -= 1
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+        return wait
+
+    def sweep(self, now: float | None = None) -> None:
+        """Drops the buckets that are full again"""
+
+        now = time.monotonic() if now is None else now
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket[2] > now}
+        self.next_sweep = now + self.sweep_interval
+
+    async def close(self) -> None:
+        self.buckets.clear()
+
+
+# Same algorithm as MemoryBackend in a single atomic step, keys expire once full
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = capacity
+if bucket[1] then
+    tokens = math.min(capacity, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * refill_rate)
+end
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / refill_rate
+else
+    tokens = tokens - 1
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil((capacity - tokens) / refill_rate * 1000) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """
+    Buckets shared by every worker and instance through Redis. An already built
+    client, e.g. a local stand-in for tests, can be given instead of a url.
+    """
+
+    def __init__(self, url: str | None = None, prefix: str = "rate-limit:", client=None):
+        if client is None:
+            if aioredis is None:
+                raise ValueError("A shared rate limit backend requires the redis package")
+            client = aioredis.from_url(url)
+
+        self.prefix = prefix
+        self.client = client
+        self.script = self.client.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        wait = await self.script(
+            keys=[f"{self.prefix}{key}"], args=[capacity, refill_rate, time.time()]
+        )
+        return float(wait)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class RateLimiter:
+    """Checks rate limits expressed as a number of hits per period of seconds"""
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+
+    async def hit(self, scope: str, key: str, limit: int, period: float) -> float:
+        """
+        Counts a hit of the key within the scope. Returns 0 while under the limit,
+        otherwise the seconds to wait before retrying.
+        """
+
+        if not self.enabled:
+            return 0
+        return await self.backend.take(f"{scope}:{key}", limit, limit / period)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+_rate_limiter = RateLimiter(MemoryBackend())
+
+
+def init_rate_limiter(enabled: bool = True, redis_url: str | None = None) -> RateLimiter:
+    """Replaces the shared limiter, kept in memory unless a Redis url is given"""
+
+    global _rate_limiter  # pylint: disable=global-statement
+    backend: RateLimitBackend = RedisBackend(redis_url) if redis_url else MemoryBackend()
+    _rate_limiter = RateLimiter(backend, enabled)
+    return _rate_limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _rate_limiter
+
+
+async def shutdown_rate_limiter() -> None:
+    await _rate_limiter.close()
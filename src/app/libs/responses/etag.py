@@ -0,0 +1,42 @@
+"""Conditional responses through entity tags"""
+import hashlib
+from typing import Type
+
+from fastapi import Response, status
+from pydantic import BaseModel
+
+from .fast_json import model_response
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong entity tag of a response body"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header lists the entity tag, using the weak comparison"""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def conditional_model_response(
+    model: BaseModel, response_model: Type[BaseModel], if_none_match: str | None
+) -> Response:
+    """
+    Response for a model of the route response_model tagged with the hash of its
+    body. When the client already holds that version an empty 304 is sent instead.
+    """
+
+    response = model_response(model, response_model)
+    etag = compute_etag(response.body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return response
@@ -0,0 +1,69 @@
+"""Fast JSON rendering of responses"""
+from typing import Any, Type
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+ORJSON = "orjson"
+STDLIB_JSON = "json"
+
+
+def _encode_model(obj: Any) -> Any:
+    """
+    Renders pydantic models as their field values and lets orjson deal with them,
+    it natively handles UUIDs, str enums such as Role and str subclasses such as
+    EmailStr. Nested models come back through here.
+    """
+
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson. Besides plain data it takes pydantic models
+    as content and serializes them directly, skipping the jsonable_encoder walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_model)
+
+
+_response_class: Type[JSONResponse] = JSONResponse
+
+
+def init_json_response(name: str) -> Type[JSONResponse]:
+    """Chooses the class rendering JSON responses, orjson or the stdlib json module"""
+
+    global _response_class  # pylint: disable=global-statement
+    if name == ORJSON:
+        _response_class = FastJSONResponse
+    elif name == STDLIB_JSON:
+        _response_class = JSONResponse
+    else:
+        raise ValueError(f"Unknown JSON response: {name}")
+    return _response_class
+
+
+def get_json_response() -> Type[JSONResponse]:
+    return _response_class
+
+
+def model_response(
+    model: BaseModel, response_model: Type[BaseModel], status_code: int = 200, **kwargs
+) -> JSONResponse:
+    """
+    Response for an already validated model. Returning it from a route skips the
+    validation and encoding FastAPI performs against the route response_model, so
+    the model must be exactly that type: a wider one would leak its extra fields.
+    """
+
+    if type(model) is not response_model:  # pylint: disable=unidiomatic-typecheck
+        raise TypeError(f"Expected a {response_model.__name__}, got a {type(model).__name__}")
+
+    if issubclass(_response_class, FastJSONResponse):
+        return _response_class(model, status_code=status_code, **kwargs)
+    return _response_class(jsonable_encoder(model), status_code=status_code, **kwargs)
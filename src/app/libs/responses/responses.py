@@ -3,7 +3,14 @@ from typing import Any
 
 from fastapi import HTTPException, status
 
-from .schemas import BadRequest, Forbidden, NotFound, Unauthorized
+from .schemas import (
+    BadRequest,
+    Forbidden,
+    NotFound,
+    ServiceUnavailable,
+    TooManyRequests,
+    Unauthorized,
+)
 
 
 def already_exists_detail(parameter: str, value: Any) -> str:
@@ -46,7 +53,38 @@ def not_found_exception(**kwargs) -> HTTPException:
     return HTTPException(status_code=status.HTTP_404_NOT_FOUND, **kwargs)
 
 
+def too_many_requests_detail() -> str:
+    """Helper function to build the the too_many_requests error detail"""
+    return "Too many attempts, try again later"
+
+
+def too_many_requests_exception(retry_after: int = 1, **kwargs) -> HTTPException:
+    """Helper function to return an exception when a client goes over a rate limit"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=too_many_requests_detail(),
+        headers={"Retry-After": str(retry_after)},
+        **kwargs,
+    )
+
+
+def service_unavailable_detail() -> str:
+    """Helper function to build the the service_unavailable error detail"""
+    return "Server is busy, try again later"
+
+
+def service_unavailable_exception(retry_after: int = 1, **kwargs) -> HTTPException:
+    """Helper function to return an exception when the server cannot take more work"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=service_unavailable_detail(),
+        headers={"Retry-After": str(retry_after)},
+        **kwargs,
+    )
+
+
 predefined_responses = {
+    304: {"description": "Not modified since the version given in If-None-Match"},
     404: {
         "model": NotFound,
         "description": "User not found",
@@ -85,4 +123,26 @@ predefined_responses = {
             }
         },
     },
+    429: {
+        "model": TooManyRequests,
+        "description": "Rate limit exceeded",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": too_many_requests_detail(),
+                }
+            }
+        },
+    },
+    503: {
+        "model": ServiceUnavailable,
+        "description": "Server is busy",
+        "content": {
+            "application/json": {
+                "example": {
+                    "detail": service_unavailable_detail(),
+                }
+            }
+        },
+    },
 }
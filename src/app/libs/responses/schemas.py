@@ -20,3 +20,11 @@ class Forbidden(BaseResponse):
 
 class NotFound(BaseResponse):
     """Not found response"""
+
+
+class TooManyRequests(BaseResponse):
+    """Too many requests response"""
+
+
+class ServiceUnavailable(BaseResponse):
+    """Service unavailable response"""
@@ -1,12 +1,31 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from sqlalchemy.orm import configure_mappers
 
-from app.routers import auth, users
+from app.libs.crypt import crypt
+from app.libs.crypt.hasher import init_hasher, shutdown_hasher
+from app.libs.crypt.token_cache import init_token_cache
+from app.libs.metrics.instrumentation import MetricsMiddleware
+from app.libs.metrics.profiling import ProfilingMiddleware
+from app.libs.metrics.startup import StartupReport
+from app.libs.rate_limit.buckets import init_rate_limiter, shutdown_rate_limiter
+from app.libs.responses.fast_json import init_json_response
+from app.routers import auth, metrics, status, users
 from app.settings import settings
-from app.storage.database import init_db
+from app.storage.database import dispose_db, init_db, warm_up_db
+from app.storage.routing import LastWriteCookieMiddleware
+
+# Shows up in the uvicorn and gunicorn logs
+logger = logging.getLogger("uvicorn.error")
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(
+    title=settings.app_name, default_response_class=init_json_response(settings.json_response)
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,15 +35,85 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.allowed_hosts)
+app.add_middleware(LastWriteCookieMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.profiling_directory,
+        secret=settings.profiling_secret,
+        sample_rate=settings.profiling_sample_rate,
+        max_bytes=settings.profiling_max_megabytes * 1024 * 1024,
+    )
 
 
 app.include_router(auth.router, tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
+app.include_router(status.router, prefix="/status", tags=["status"])
+app.include_router(metrics.router, tags=["status"])
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """
+    Builds every per worker resource and warms it up before the first request, so
+    no request pays for connecting, mapper configuration, loading bcrypt or the
+    OpenAPI schema. Everything is released on shutdown.
+    """
+
+    report = StartupReport()
+    with report.step("database"):
+        init_db(
+            settings.database_url,
+            settings.database_driver,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+            pool_pre_ping=settings.database_pool_pre_ping,
+            replica_urls=settings.database_replica_urls,
+            replica_balancing=settings.database_replica_balancing,
+            replica_pin_seconds=settings.database_replica_pin_seconds,
+        )
+        await warm_up_db(min(settings.database_pool_warm_size, settings.database_pool_size))
+    with report.step("mappers"):
+        configure_mappers()
+
+    with report.step("crypt"):
+        bcrypt_rounds = None
+        if settings.password_hash_target_ms:
+            bcrypt_rounds = crypt.calibrate_bcrypt_rounds(
+                settings.password_hash_target_ms, settings.password_hash_min_rounds
+            )
+        crypt.configure_pwd_context(bcrypt_rounds)
+        crypt.warm_up()
+        hasher = init_hasher(
+            settings.password_hasher_workers,
+            settings.password_hasher_max_pending,
+            settings.password_hasher_use_processes,
+            bcrypt_rounds,
+            settings.password_hasher_bulk_workers,
+        )
+        await hasher.warm_up()
+    with report.step("caches"):
+        init_token_cache(settings.token_cache_size)
+        init_rate_limiter(settings.rate_limit_enabled, settings.rate_limit_redis_url)
+    with report.step("openapi"):
+        application.openapi()
+
+    report.finish()
+    application.state.startup_report = report
+    logger.info(report.summary())
+
+    yield
+
+    await dispose_db()
+    shutdown_hasher()
+    await shutdown_rate_limiter()
 
 
-@app.on_event("startup")
-def startup_event():
-    init_db(settings.database_url)
+app.router.lifespan_context = lifespan
 
 
 @app.get("/status")
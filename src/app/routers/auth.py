@@ -5,22 +5,35 @@ from pydantic import EmailStr, ValidationError
 from app.controllers import auth, users
 from app.controllers.auth import UserNotCorrectlyAuthenticatedError
 from app.controllers.users import UserAlreadyExistsError
+from app.libs.crypt.hasher import HasherBusyError
 from app.libs.crypt.schemas import Token
 from app.libs.responses import responses
 from app.schemas.users import CreateUserData, LoginUserData
 from app.services.db_interface import DBInterface
-from app.storage.models import DBUser
+from app.settings import settings
 
-from .dependencies import get_responses
+from .dependencies import (
+    get_responses,
+    get_users_interface,
+    limit_login_attempts,
+    rate_limit_by_ip,
+)
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=Token, responses=get_responses([403]))
-async def login_user(form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
+@router.post(
+    "/login",
+    response_model=Token,
+    responses=get_responses([403, 429, 503]),
+    dependencies=[Depends(limit_login_attempts)],
+)
+async def login_user(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    users_interface: DBInterface = Depends(get_users_interface),
+) -> Token:
     """Logins user with email + password and returns a JWT with user's ID"""
 
-    users_interface = DBInterface(DBUser)
     try:
         login_attempt = LoginUserData(
             email=EmailStr(form_data.username), password=form_data.password
@@ -33,18 +46,30 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
     except ValidationError as exception:
         raise responses.bad_request_exception(detail="Not a valid email") from exception
 
+    except HasherBusyError as exception:
+        raise responses.service_unavailable_exception() from exception
 
-@router.post("/signup", status_code=status.HTTP_201_CREATED, responses=get_responses([400]))
-async def signup_user(new_user: CreateUserData):
+
+@router.post(
+    "/signup",
+    status_code=status.HTTP_201_CREATED,
+    responses=get_responses([400, 429, 503]),
+    dependencies=[Depends(rate_limit_by_ip("signup", settings.signup_rate_limit_per_ip))],
+)
+async def signup_user(
+    new_user: CreateUserData, users_interface: DBInterface = Depends(get_users_interface)
+):
     """Creates a new user into the system"""
 
-    users_interface = DBInterface(DBUser)
     try:
         await users.create(new_user, users_interface)
 
     except UserAlreadyExistsError as exception:
         raise responses.bad_request_exception(
-            detail=responses.already_exists_detail("email", exception.email)
+            detail=responses.already_exists_detail(exception.field, exception.value)
         ) from exception
 
+    except HasherBusyError as exception:
+        raise responses.service_unavailable_exception() from exception
+
     return Response(status_code=status.HTTP_201_CREATED)
@@ -1,28 +1,62 @@
-from typing import List
+import math
+from typing import AsyncIterator, Callable, List
 
-from fastapi import Depends
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.controllers import auth
 from app.controllers.auth import CryptError
 from app.controllers.users import UserNotFoundError
 from app.libs.crypt.schemas import Token
+from app.libs.rate_limit.buckets import get_rate_limiter
 from app.libs.responses import responses
 from app.schemas.users import Role, User
 from app.services.db_interface import DBInterface
+from app.settings import settings
+from app.storage.database import get_session
 from app.storage.models import DBUser
+from app.storage.routing import LAST_WRITE_COOKIE, parse_last_write
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-async def get_current_user(token: Token = Depends(oauth2_scheme)) -> User:
+async def get_db_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Unit of work shared by every dependency and handler of a single request.
+    Commits when the request succeeds, rolls back otherwise and always closes.
+    The session knows when the client last wrote so it reads from the primary
+    after its writes, and the request state keeps it to tell the client about new ones.
+    """
+
+    session = get_session()
+    session.info["last_write"] = parse_last_write(request.cookies.get(LAST_WRITE_COOKIE))
+    request.state.db_session = session
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def get_users_interface(session: AsyncSession = Depends(get_db_session)) -> DBInterface:
+    """Users interface bound to the request session"""
+    return DBInterface(DBUser, session)
+
+
+async def get_current_user(
+    token: Token = Depends(oauth2_scheme),
+    users_interface: DBInterface = Depends(get_users_interface),
+) -> User:
     """Gets user based on JWT"""
 
     credentials_exception = responses.unauthorized_exception(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    users_interface = DBInterface(DBUser)
     try:
         return await auth.read_user_by_token(token, users_interface)
     except (CryptError, UserNotFoundError) as exception:
@@ -37,6 +71,43 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
     return current_user
 
 
+def client_address(request: Request) -> str | None:
+    return request.client.host if request.client else None
+
+
+async def check_rate_limit(scope: str, key: str | None, limit: int, period: float = 60) -> None:
+    """Raises a 429 with the seconds to wait once the key goes over the limit"""
+
+    if key is None:
+        return
+    wait = await get_rate_limiter().hit(scope, key, limit, period)
+    if wait:
+        raise responses.too_many_requests_exception(retry_after=math.ceil(wait))
+
+
+def rate_limit_by_ip(scope: str, limit: int, period: float = 60) -> Callable:
+    """Dependency allowing each client address `limit` requests per `period` seconds"""
+
+    async def _rate_limit_by_ip(request: Request) -> None:
+        await check_rate_limit(scope, client_address(request), limit, period)
+
+    return _rate_limit_by_ip
+
+
+async def limit_login_attempts(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """
+    Throttles logins per client address and per email before any password is
+    verified, so a credential stuffing burst cannot keep bcrypt busy.
+    """
+
+    await check_rate_limit("login-ip", client_address(request), settings.login_rate_limit_per_ip)
+    await check_rate_limit(
+        "login-email", form_data.username.lower(), settings.login_rate_limit_per_email
+    )
+
+
 def get_responses(codes: List[int]) -> dict:
     """Helper function to return the expected dictionary of responses in routers"""
 
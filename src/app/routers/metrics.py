@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.libs.metrics.instrumentation import registry
+
+router = APIRouter()
+
+# Version of the Prometheus text exposition format
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics of the worker serving the request in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type=EXPOSITION_CONTENT_TYPE)
@@ -0,0 +1,37 @@
+import os
+
+from fastapi import APIRouter, Request
+
+from app.libs.crypt.token_cache import get_token_cache
+from app.libs.responses import responses
+from app.schemas.status import PoolStatus, StartupStatus, TokenCacheStatus
+from app.storage.database import get_pool_statistics
+
+from .dependencies import get_responses
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=PoolStatus)
+async def pool_status():
+    """Connection pool usage of the worker serving the request, wait time in seconds"""
+    return PoolStatus(pid=os.getpid(), **get_pool_statistics())
+
+
+@router.get("/token-cache", response_model=TokenCacheStatus)
+async def token_cache_status():
+    """Verified JWT cache usage of the worker serving the request"""
+    return TokenCacheStatus(pid=os.getpid(), **get_token_cache().statistics())
+
+
+@router.get("/startup", response_model=StartupStatus, responses=get_responses([404]))
+async def startup_status(request: Request):
+    """
+    Time the worker serving the request took to start and warm up, in seconds.
+    Not found when the app was served without running its lifespan.
+    """
+
+    report = getattr(request.app.state, "startup_report", None)
+    if report is None:
+        raise responses.not_found_exception(detail="The worker has no startup report")
+    return StartupStatus(pid=os.getpid(), total=report.total, steps=report.steps)
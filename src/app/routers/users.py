@@ -1,34 +1,183 @@
 from typing import List
+from uuid import UUID
 
 import fastapi
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Header, Query, status
+from fastapi.responses import StreamingResponse
 
 from app.controllers import users
-from app.schemas.users import User
+from app.controllers.users import (
+    InvalidCursorError,
+    MissingFilterError,
+    UserAlreadyExistsError,
+    UserIsNotAuthorizedError,
+    UserNotFoundError,
+)
+from app.libs.crypt.hasher import HasherBusyError
+from app.libs.responses import responses
+from app.libs.responses.etag import conditional_model_response
+from app.schemas.users import (
+    BulkCreateResult,
+    BulkDeleteResult,
+    CreateUserData,
+    UpdateUserData,
+    User,
+    UsersFilter,
+    UsersPage,
+)
 from app.services.db_interface import DBInterface
-from app.storage.models import DBUser
+from app.settings import settings
 
-from .dependencies import get_current_admin_user, get_current_user
+from .dependencies import (
+    get_current_admin_user,
+    get_current_user,
+    get_responses,
+    get_users_interface,
+)
 
 router = APIRouter()
 
 
-@router.get("/me", response_model=User)
-async def retrieve_users_info(current_user: User = Depends(get_current_user)):
-    """Retrieves current user info"""
-    return current_user
+@router.get("/me", response_model=User, responses=get_responses([304]))
+async def retrieve_users_info(
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_user),
+):
+    """Retrieves current user info, answers 304 when If-None-Match holds its ETag"""
+    return conditional_model_response(current_user, User, if_none_match)
 
 
-@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_current_user(current_user: User = Depends(get_current_user)):
+@router.patch("/me", response_model=User, responses=get_responses([400, 403, 503]))
+async def update_current_user(
+    user_data: UpdateUserData,
+    current_user: User = Depends(get_current_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
+    """Updates the given fields of the logged user, only admins can change their role"""
+    return await _update_user(current_user, current_user.id, user_data, users_interface)
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT, responses=get_responses([404]))
+async def delete_current_user(
+    current_user: User = Depends(get_current_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
     """Deletes logged user"""
-    users_interface = DBInterface(DBUser)
-    await users.delete(current_user, users_interface)
+
+    try:
+        await users.delete(current_user, users_interface)
+    except UserNotFoundError as exception:
+        raise responses.not_found_exception(
+            detail=responses.not_found_detail("id", exception.user_id)
+        ) from exception
+
     return fastapi.Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.get("", response_model=List[User])
-async def retrieve_users(current_user: User = Depends(get_current_admin_user)):
-    """Retrieves all users info"""
-    users_interface = DBInterface(DBUser)
-    return await users.read_all(current_user, users_interface)
+@router.get("", response_model=UsersPage, responses=get_responses([304, 400]))
+async def retrieve_users(
+    users_filter: UsersFilter = Depends(),
+    limit: int = Query(settings.users_page_size, ge=1, le=settings.users_page_max_size),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_admin_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
+    """
+    Retrieves a page of users info, pass the returned next_cursor to get the next one.
+    Answers 304 when If-None-Match holds the ETag of the page.
+    """
+
+    try:
+        page = await users.read_page(current_user, users_filter, limit, cursor, users_interface)
+    except InvalidCursorError as exception:
+        raise responses.bad_request_exception(detail="Not a valid cursor") from exception
+    return conditional_model_response(page, UsersPage, if_none_match)
+
+
+@router.delete("", response_model=BulkDeleteResult, responses=get_responses([400]))
+async def delete_users(
+    users_filter: UsersFilter = Depends(),
+    exclude_names: List[str] = Query([]),
+    current_user: User = Depends(get_current_admin_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
+    """
+    Deletes every user matching the filters but the excluded names and the logged admin,
+    e.g. exclude_names=pepe removes all but the default data
+    """
+
+    try:
+        return await users.delete_many(current_user, users_filter, exclude_names, users_interface)
+    except MissingFilterError as exception:
+        raise responses.bad_request_exception(
+            detail="At least one filter or exclusion is required"
+        ) from exception
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    users_filter: UsersFilter = Depends(),
+    current_user: User = Depends(get_current_admin_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
+    """Streams every user info as newline delimited JSON"""
+    return StreamingResponse(
+        users.export_ndjson(current_user, users_filter, users_interface),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkCreateResult,
+    status_code=status.HTTP_201_CREATED,
+    responses=get_responses([503]),
+)
+async def create_users(
+    users_to_create: List[CreateUserData] = Body(..., max_items=settings.users_bulk_max_size),
+    current_user: User = Depends(get_current_admin_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
+    """Creates many users at once, users that already exist are reported as conflicts"""
+
+    try:
+        return await users.create_many(
+            current_user, users_to_create, users_interface, settings.users_bulk_batch_size
+        )
+    except HasherBusyError as exception:
+        raise responses.service_unavailable_exception() from exception
+
+
+@router.patch("/{user_id}", response_model=User, responses=get_responses([400, 404, 503]))
+async def update_user(
+    user_id: UUID,
+    user_data: UpdateUserData,
+    current_user: User = Depends(get_current_admin_user),
+    users_interface: DBInterface = Depends(get_users_interface),
+):
+    """Updates the given fields of any user"""
+    return await _update_user(current_user, user_id, user_data, users_interface)
+
+
+async def _update_user(
+    current_user: User, user_id: UUID, user_data: UpdateUserData, users_interface: DBInterface
+) -> User:
+    try:
+        return await users.update(current_user, user_id, user_data, users_interface)
+
+    except UserAlreadyExistsError as exception:
+        raise responses.bad_request_exception(
+            detail=responses.already_exists_detail(exception.field, exception.value)
+        ) from exception
+
+    except UserIsNotAuthorizedError as exception:
+        raise responses.forbidden_exception(detail="Only admins can change roles") from exception
+
+    except UserNotFoundError as exception:
+        raise responses.not_found_exception(
+            detail=responses.not_found_detail("id", exception.user_id)
+        ) from exception
+
+    except HasherBusyError as exception:
+        raise responses.service_unavailable_exception() from exception
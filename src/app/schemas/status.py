@@ -0,0 +1,73 @@
+"""Service status Models"""
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class PoolStatus(BaseModel):
+    """Database connection pool usage of a single worker"""
+
+    pid: int
+    size: int = 0
+    checked_out: int = 0
+    idle: int = 0
+    overflow: int = 0
+    checkouts: int = 0
+    wait_time: float = 0
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "pid": 8,
+                "size": 5,
+                "checked_out": 2,
+                "idle": 3,
+                "overflow": 0,
+                "checkouts": 1520,
+                "wait_time": 0.734,
+            }
+        }
+
+
+class TokenCacheStatus(BaseModel):
+    """Verified JWT cache usage of a single worker"""
+
+    pid: int
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "pid": 8,
+                "size": 120,
+                "max_size": 1024,
+                "hits": 45210,
+                "misses": 342,
+            }
+        }
+
+
+class StartupStatus(BaseModel):
+    """Seconds a single worker took to start, in total and per step"""
+
+    pid: int
+    total: float
+    steps: Dict[str, float]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "pid": 8,
+                "total": 0.183,
+                "steps": {
+                    "database": 0.041,
+                    "mappers": 0.012,
+                    "crypt": 0.048,
+                    "caches": 0.001,
+                    "openapi": 0.081,
+                },
+            }
+        }
@@ -1,8 +1,9 @@
 """User Models"""
 from enum import Enum
+from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, validator
 
 
 class Role(str, Enum):
@@ -11,11 +12,22 @@ class Role(str, Enum):
     GUEST = "guest"
 
 
+def normalize_email(email: str | None) -> str | None:
+    """
+    Emails are stored and looked up lowercased, so matching them ignores case while
+    still being a single lookup on the unique email index
+    """
+
+    return email.lower() if email is not None else None
+
+
 class UserBase(BaseModel):
     name: str
     email: EmailStr
     role: Role
 
+    _normalize_email = validator("email", allow_reuse=True)(normalize_email)
+
     class Config:
         orm_mode = True
 
@@ -58,6 +70,8 @@ class LoginUserData(BaseModel):
     email: EmailStr
     password: str
 
+    _normalize_email = validator("email", allow_reuse=True)(normalize_email)
+
     class Config:
         schema_extra = {
             "example": {
@@ -75,9 +89,68 @@ class UpdateUserData(BaseModel):
     password: str | None
     role: Role | None
 
+    _normalize_email = validator("email", allow_reuse=True)(normalize_email)
+
     class Config:
         schema_extra = {
             "example": {
                 "email": "bar@example.com",
             }
         }
+
+
+class UsersFilter(BaseModel):
+    """Filters available when listing users"""
+
+    role: Role | None
+    email_prefix: str | None
+    name_prefix: str | None
+
+    _normalize_email_prefix = validator("email_prefix", allow_reuse=True)(normalize_email)
+
+
+class UsersPage(BaseModel):
+    """Page of users ordered by name and the cursor to request the following one"""
+
+    users: List[User]
+    next_cursor: str | None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "users": [User.Config.schema_extra["example"]],
+                "next_cursor": "WyJGb28iLCAiYTFiMmMzZDQtZTVmNi1nN2g4LWk5ajAtazFsMm0zbjRvNXA2Il0=",
+            }
+        }
+
+
+class UserConflict(BaseModel):
+    """User that could not be created because its name or email already exist"""
+
+    index: int
+    name: str
+    email: EmailStr
+
+
+class BulkCreateResult(BaseModel):
+    """Outcome of a bulk creation, conflicting users are skipped"""
+
+    created: int
+    conflicts: List[UserConflict]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "created": 2,
+                "conflicts": [{"index": 1, "name": "Foo", "email": "foo@example.com"}],
+            }
+        }
+
+
+class BulkDeleteResult(BaseModel):
+    """Outcome of a bulk deletion"""
+
+    deleted: int
+
+    class Config:
+        schema_extra = {"example": {"deleted": 42}}
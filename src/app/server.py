@@ -0,0 +1,69 @@
+"""
+Production server: a gunicorn master that imports the app once and forks uvicorn
+workers, all of them configured from Settings.
+
+    python -m app.server
+"""
+import multiprocessing
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from app.settings import settings
+from app.storage.database import get_engine
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker running the configured event loop and HTTP parser"""
+
+    CONFIG_KWARGS = {"loop": settings.server_loop, "http": settings.server_http}
+
+
+def post_fork(_server, _worker) -> None:
+    """
+    Drops any engine inherited from the master, connections must never be shared
+    between processes. The app creates its own on startup, once in the worker.
+    """
+
+    engine = get_engine()
+    if engine is not None:
+        engine.sync_engine.dispose(close=False)
+
+
+def server_options() -> dict:
+    """Gunicorn configuration, the worker count defaults to the number of CPUs"""
+
+    return {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": settings.server_workers or multiprocessing.cpu_count(),
+        "worker_class": Worker,
+        "preload_app": settings.server_preload,
+        "keepalive": settings.server_keepalive,
+        "backlog": settings.server_backlog,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "post_fork": post_fork,
+    }
+
+
+class Server(BaseApplication):  # pylint: disable=abstract-method
+    """Gunicorn application serving app.main:app"""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app  # pylint: disable=import-outside-toplevel
+
+        return app
+
+
+if __name__ == "__main__":
+    Server(server_options()).run()
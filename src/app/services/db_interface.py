@@ -1,18 +1,36 @@
 from __future__ import annotations
 
-from typing import Any, List
+from typing import Any, AsyncIterator, Dict, List, Sequence
 from uuid import UUID
 
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    RowMapping,
+    Select,
+    delete,
+    inspect,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.storage.data_interface import DataObject, DBObject
-from app.storage.database import get_session
 
 
 def exception_handling(function):
     """try except handling"""
 
-    def wrapper(*args, **kwargs):
+    async def wrapper(self, *args, **kwargs):
         try:
-            return function(*args, **kwargs)
+            return await function(self, *args, **kwargs)
+        except IntegrityError as exception:
+            await self.session.rollback()
+            raise ConflictError("Data clashes with a stored object") from exception
         except Exception as exception:
             raise DatabaseError("Something wrong happened!") from exception
 
@@ -22,59 +40,252 @@ def exception_handling(function):
 class DBInterface:
     """
     Generic Database interface to interact with any modeled object.
-    Recieves the modeled database object as parameter.
+    Recieves the modeled database object and the session to work with as parameters.
+
+    Every query is awaited on an async session, so a slow statement never
+    blocks the event loop serving the rest of the requests. The session
+    lifecycle belongs to the caller, usually one session per request.
 
     Can be expanded through inheritance and therefore create more
     specific services if needed.
     """
 
-    def __init__(self, db_class: DBObject):
+    def __init__(self, db_class: DBObject, session: AsyncSession):
         self.db_class = db_class
+        self.session = session
 
     @exception_handling
-    async def read_by_id(self, id: int | UUID) -> DBObject:
-        session = get_session()
-        return session.query(self.db_class).get(id)
+    async def read_by_id(
+        self, id: int | UUID, fields: Sequence[str] | None = None
+    ) -> DBObject | RowMapping | None:
+        if not fields:
+            return await self.session.get(self.db_class, id)
+
+        primary_key = inspect(self.db_class).primary_key[0]
+        result = await self.session.execute(self._select(fields).filter(primary_key == id))
+        return result.mappings().first()
 
     @exception_handling
-    async def read_by_field(self, field_name: str, field_value: Any) -> DBObject:
-        session = get_session()
-        return (
-            session.query(self.db_class)
-            .filter(getattr(self.db_class, field_name) == field_value)
-            .first()
-        )
+    async def read_by_field(
+        self, field_name: str, field_value: Any, fields: Sequence[str] | None = None
+    ) -> DBObject | RowMapping | None:
+        query = self._select(fields).filter(getattr(self.db_class, field_name) == field_value)
+        return (await self._fetch(query.limit(1), fields)).first()
 
     @exception_handling
     async def read_all(self) -> List[DBObject]:
-        session = get_session()
-        return session.query(self.db_class).all()
+        return list(await self.session.scalars(select(self.db_class)))
 
     @exception_handling
-    async def create(self, data: DBObject) -> DBObject:
-        session = get_session()
-        session.add(data)
-        session.commit()
-        session.refresh(data)
-        return data
+    async def read_page(
+        self,
+        order_by: Sequence[str],
+        limit: int,
+        after: Sequence[Any] | None = None,
+        equal_to: Dict[str, Any] | None = None,
+        starting_with: Dict[str, str] | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> List[DBObject] | List[RowMapping]:
+        """
+        Keyset pagination: returns up to `limit` objects sorted by the `order_by`
+        fields that come after the `after` values of those same fields, so deep
+        pages cost the same as the first one. Filters are applied in the query.
+        """
+
+        columns = [getattr(self.db_class, field_name) for field_name in order_by]
+        query = self._filtered_query(fields, equal_to, starting_with)
+        query = query.order_by(*columns).limit(limit)
+        if after is not None:
+            query = query.filter(tuple_(*columns) > tuple_(*after))
+
+        return list(await self._fetch(query, fields))
+
+    async def stream(
+        self,
+        order_by: Sequence[str],
+        equal_to: Dict[str, Any] | None = None,
+        starting_with: Dict[str, str] | None = None,
+        batch_size: int = 1000,
+        fields: Sequence[str] | None = None,
+    ) -> AsyncIterator[DBObject | RowMapping]:
+        """
+        Yields every matching object through a server-side cursor fetching
+        `batch_size` rows at a time, so memory stays flat whatever the table size.
+        """
+
+        columns = [getattr(self.db_class, field_name) for field_name in order_by]
+        query = self._filtered_query(fields, equal_to, starting_with).order_by(*columns)
+        query = query.execution_options(yield_per=batch_size)
+        try:
+            if fields:
+                result = (await self.session.stream(query)).mappings()
+            else:
+                result = await self.session.stream_scalars(query)
+            async for data in result:
+                yield data
+        except Exception as exception:
+            raise DatabaseError("Something wrong happened!") from exception
+
+    def _select(self, fields: Sequence[str] | None) -> Select:
+        """
+        Selects whole objects or, given some fields, only those columns. Projected
+        reads skip loading unneeded columns and the ORM identity map altogether.
+        """
+
+        if not fields:
+            return select(self.db_class)
+        return select(*(getattr(self.db_class, field_name) for field_name in fields))
+
+    async def _fetch(self, query: Select, fields: Sequence[str] | None):
+        if not fields:
+            return await self.session.scalars(query)
+        return (await self.session.execute(query)).mappings()
+
+    def _filtered_query(
+        self,
+        fields: Sequence[str] | None,
+        equal_to: Dict[str, Any] | None,
+        starting_with: Dict[str, str] | None,
+    ) -> Select:
+        return self._select(fields).filter(*self._conditions(equal_to, starting_with))
+
+    def _conditions(
+        self,
+        equal_to: Dict[str, Any] | None,
+        starting_with: Dict[str, str] | None,
+        not_in: Dict[str, Sequence[Any]] | None = None,
+    ) -> List[ColumnElement]:
+        conditions = []
+        for field_name, field_value in (equal_to or {}).items():
+            conditions.append(getattr(self.db_class, field_name) == field_value)
+        for field_name, prefix in (starting_with or {}).items():
+            conditions.append(
+                getattr(self.db_class, field_name).startswith(prefix, autoescape=True)
+            )
+        for field_name, field_values in (not_in or {}).items():
+            conditions.append(getattr(self.db_class, field_name).not_in(field_values))
+        return conditions
 
     @exception_handling
-    async def update(self, id: int | UUID, data: DataObject) -> DBObject:
-        session = get_session()
-        result = session.query(self.db_class).get(id)
-        for key, value in data.dict().items():  # type: ignore
-            setattr(result, key, value)
-        session.commit()
-        session.refresh(result)
-        return result
+    async def create(self, data: Dict[str, Any], returning: Sequence[str]) -> RowMapping | None:
+        """
+        Inserts an object with a single INSERT ... ON CONFLICT DO NOTHING RETURNING
+        statement. Returns the `returning` fields of the new row, or None when it
+        clashes with a unique constraint, see find_conflicts.
+        """
+
+        columns = [getattr(self.db_class, field_name) for field_name in returning]
+        query = insert_ignoring_conflicts(self.db_class, self.session)
+        result = await self.session.execute(query.values(**data).returning(*columns))
+        created = result.mappings().first()
+        await self.session.commit()
+        return created
 
     @exception_handling
-    async def delete(self, id: int | UUID) -> None:
-        session = get_session()
-        result = session.query(self.db_class).get(id)
-        session.delete(result)
-        session.commit()
+    async def find_conflicts(
+        self, data: Dict[str, Any], exclude_id: int | UUID | None = None
+    ) -> List[str]:
+        """
+        Unique fields whose value in data is already taken by a stored object,
+        other than the one with id `exclude_id` when updating it
+        """
+
+        unique_columns = [
+            column
+            for column in inspect(self.db_class).columns
+            if column.unique and column.key in data
+        ]
+        if not unique_columns:
+            return []
+
+        matches = [column == data[column.key] for column in unique_columns]
+        query = select(*matches).filter(or_(*matches))
+        if exclude_id is not None:
+            query = query.filter(inspect(self.db_class).primary_key[0] != exclude_id)
+        result = await self.session.execute(query)
+        conflicts = set()
+        for row in result:
+            conflicts.update(column.key for column, match in zip(unique_columns, row) if match)
+        return [column.key for column in unique_columns if column.key in conflicts]
+
+    @exception_handling
+    async def create_many(
+        self, data: List[Dict[str, Any]], returning: Sequence[str], batch_size: int = 500
+    ) -> List[RowMapping]:
+        """
+        Inserts many objects with multi-row INSERT statements of `batch_size` rows.
+        Rows clashing with a unique constraint are skipped instead of aborting the
+        batch, only the `returning` fields of the inserted rows are returned.
+        """
+
+        columns = [getattr(self.db_class, field_name) for field_name in returning]
+        query = insert_ignoring_conflicts(self.db_class, self.session).returning(*columns)
+        inserted: List[RowMapping] = []
+        for start in range(0, len(data), batch_size):
+            result = await self.session.execute(query, data[start : start + batch_size])
+            inserted.extend(result.mappings())
+        await self.session.commit()
+        return inserted
+
+    @exception_handling
+    async def update(
+        self, id: int | UUID, data: Dict[str, Any], returning: Sequence[str]
+    ) -> RowMapping | None:
+        """
+        Updates the given fields of an object with a single UPDATE ... RETURNING
+        statement. Returns the `returning` fields of the updated row or None when
+        there is no object with that id.
+        """
+
+        primary_key = inspect(self.db_class).primary_key[0]
+        columns = [getattr(self.db_class, field_name) for field_name in returning]
+        query = update(self.db_class).filter(primary_key == id).values(**data).returning(*columns)
+        updated = (await self.session.execute(query)).mappings().first()
+        await self.session.commit()
+        return updated
+
+    @exception_handling
+    async def delete(self, id: int | UUID) -> bool:
+        """Deletes an object with a single statement, returns whether it existed"""
+
+        primary_key = inspect(self.db_class).primary_key[0]
+        query = delete(self.db_class).filter(primary_key == id).returning(primary_key)
+        deleted = (await self.session.execute(query)).first()
+        await self.session.commit()
+        return deleted is not None
+
+    @exception_handling
+    async def delete_many(
+        self,
+        equal_to: Dict[str, Any] | None = None,
+        starting_with: Dict[str, str] | None = None,
+        not_in: Dict[str, Sequence[Any]] | None = None,
+    ) -> int:
+        """Deletes every object matching the filters with a single statement, returns how many"""
+
+        conditions = self._conditions(equal_to, starting_with, not_in)
+        result = await self.session.execute(delete(self.db_class).filter(*conditions))
+        await self.session.commit()
+        return result.rowcount
+
+
+def insert_ignoring_conflicts(db_class: DBObject, session: AsyncSession) -> Insert:
+    """
+    INSERT ... ON CONFLICT DO NOTHING for the dialect of the primary bind, asking
+    the session for a bind would pick a replica when reading from them
+    """
+
+    dialect_name = session.bind.dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(db_class).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        return sqlite.insert(db_class).on_conflict_do_nothing()
+    raise NotImplementedError(f"Conflict handling is not supported on {dialect_name}")
 
 
 class DatabaseError(Exception):
     """Fails to interact with the Database"""
+
+
+class ConflictError(DatabaseError):
+    """Write rejected because it clashes with a unique constraint"""
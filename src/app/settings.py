@@ -1,16 +1,88 @@
 from typing import List
 
-from pydantic import BaseSettings, PostgresDsn
+from pydantic import BaseSettings
 
 
 class Settings(BaseSettings):
     app_name: str = "Admin Service"
 
     secret_key: str
-    database_url: PostgresDsn
+    database_url: str
+    database_driver: str = "asyncpg"
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30
+    database_pool_recycle: int = -1
+    database_pool_pre_ping: bool = False
+    # Connections opened on startup, so the first requests do not wait for them
+    database_pool_warm_size: int = 2
+    # Reads are spread among the replicas, writes and the reads of clients that
+    # wrote in the last database_replica_pin_seconds go to the primary database
+    database_replica_urls: List[str] = []
+    database_replica_balancing: str = "round_robin"
+    database_replica_pin_seconds: float = 5
+
+    password_hasher_workers: int = 2
+    password_hasher_max_pending: int = 32
+    password_hasher_use_processes: bool = False
+    # Workers bulk imports may hash on at once, all but one when there are more than two
+    password_hasher_bulk_workers: int | None = None
+    password_hash_target_ms: float | None = None
+    password_hash_min_rounds: int = 10
 
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_size: int = 1024
+
+    # Stateless mode signs the user profile into the token so authenticated requests
+    # skip the database. Role changes and deletions take effect once the short lived
+    # token expires, or straight away for everyone by bumping token_claims_version.
+    stateless_auth: bool = False
+    stateless_access_token_expire_minutes: int = 5
+    token_claims_version: int = 1
+
+    # Attempts allowed per minute, counted in memory unless a Redis url is given
+    rate_limit_enabled: bool = True
+    rate_limit_redis_url: str | None = None
+    login_rate_limit_per_ip: int = 30
+    login_rate_limit_per_email: int = 5
+    signup_rate_limit_per_ip: int = 10
+
+    users_page_size: int = 100
+    users_page_max_size: int = 1000
+    users_bulk_max_size: int = 10000
+    users_bulk_batch_size: int = 500
+
+    # Renders responses with orjson, set to "json" for the stdlib json module
+    json_response: str = "orjson"
+
+    # Times requests, queries, bcrypt and JWT decoding to expose them on /metrics
+    metrics_enabled: bool = True
+    # Profiles requests sent with the X-Profile: <profiling_secret> header and a
+    # profiling_sample_rate share of the rest, nothing is installed when disabled
+    profiling_enabled: bool = False
+    profiling_secret: str | None = None
+    profiling_sample_rate: float = 0
+    profiling_directory: str = "/tmp/app-profiles"
+    profiling_max_megabytes: int = 100
+
+    # Production server, see app.server. Workers default to the number of CPUs,
+    # each one is recycled after max_requests, plus a random jitter, when set.
+    # X-Forwarded-For is only trusted from forwarded_allow_ips, a comma separated
+    # list of proxy addresses, set it to the nginx container one when behind it.
+    # Never "*": clients could pick their address and dodge per IP rate limits
+    server_host: str = "0.0.0.0"
+    server_port: int = 80
+    server_workers: int | None = None
+    server_loop: str = "auto"
+    server_http: str = "auto"
+    server_keepalive: int = 5
+    server_backlog: int = 2048
+    server_max_requests: int = 0
+    server_max_requests_jitter: int = 0
+    server_graceful_timeout: int = 30
+    server_preload: bool = True
+    server_forwarded_allow_ips: str = "127.0.0.1"
 
     allowed_origins: List[str]
     allowed_hosts: List[str]
@@ -1,7 +1,8 @@
-from typing import Any, List, Protocol
+from typing import Any, AsyncIterator, Dict, List, Protocol, Sequence
 from uuid import UUID
 
 from pydantic import BaseModel
+from sqlalchemy import RowMapping
 
 from .models import Base
 
@@ -14,20 +15,65 @@ class DataInterface(Protocol):
     Protocol on how to instantiate any Data Interface, such a DB Interface or others.
     """
 
-    async def read_by_id(self, id: int | UUID) -> DBObject:
+    async def read_by_id(
+        self, id: int | UUID, fields: Sequence[str] | None = None
+    ) -> DBObject | RowMapping | None:
         ...
 
-    async def read_by_field(self, field: str, field_valu: Any) -> DBObject:
+    async def read_by_field(
+        self, field: str, field_valu: Any, fields: Sequence[str] | None = None
+    ) -> DBObject | RowMapping | None:
         ...
 
     async def read_all(self) -> List[DBObject]:
         ...
 
-    async def create(self, data: DBObject) -> DBObject:
+    async def read_page(
+        self,
+        order_by: Sequence[str],
+        limit: int,
+        after: Sequence[Any] | None = None,
+        equal_to: Dict[str, Any] | None = None,
+        starting_with: Dict[str, str] | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> List[DBObject] | List[RowMapping]:
         ...
 
-    async def update(self, id: int | UUID, data: DataObject) -> DBObject:
+    def stream(
+        self,
+        order_by: Sequence[str],
+        equal_to: Dict[str, Any] | None = None,
+        starting_with: Dict[str, str] | None = None,
+        batch_size: int = 1000,
+        fields: Sequence[str] | None = None,
+    ) -> AsyncIterator[DBObject | RowMapping]:
         ...
 
-    async def delete(self, id: int | UUID) -> None:
+    async def create(self, data: Dict[str, Any], returning: Sequence[str]) -> RowMapping | None:
+        ...
+
+    async def find_conflicts(
+        self, data: Dict[str, Any], exclude_id: int | UUID | None = None
+    ) -> List[str]:
+        ...
+
+    async def create_many(
+        self, data: List[Dict[str, Any]], returning: Sequence[str], batch_size: int = 500
+    ) -> List[RowMapping]:
+        ...
+
+    async def update(
+        self, id: int | UUID, data: Dict[str, Any], returning: Sequence[str]
+    ) -> RowMapping | None:
+        ...
+
+    async def delete(self, id: int | UUID) -> bool:
+        ...
+
+    async def delete_many(
+        self,
+        equal_to: Dict[str, Any] | None = None,
+        starting_with: Dict[str, str] | None = None,
+        not_in: Dict[str, Sequence[Any]] | None = None,
+    ) -> int:
         ...
@@ -1,17 +1,125 @@
-from sqlalchemy.engine import create_engine
-from sqlalchemy.engine.base import Engine
-from sqlalchemy.orm import Session, sessionmaker
+import time
+from contextlib import AsyncExitStack
+from typing import Sequence
 
-from app.storage.models import Base
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-DBSession = sessionmaker(autocommit=False, autoflush=False)
+from app.libs.metrics.instrumentation import observe_db_query
+from app.storage.pool import TimedQueuePool
+from app.storage.routing import ROUND_ROBIN, Replicas, RoutingSession
 
+DBSession = async_sessionmaker(
+    sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
 
-def init_db(database_url) -> None:
-    engine: Engine = create_engine(database_url)
-    Base.metadata.bind = engine
-    DBSession.bind = engine  # type: ignore
 
+def init_db(
+    database_url: str,
+    database_driver: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+    replica_urls: Sequence[str] = (),
+    replica_balancing: str = ROUND_ROBIN,
+    replica_pin_seconds: float = 5,
+) -> AsyncEngine:
+    """
+    Binds the session factory to a new async engine using the given driver and pool.
+    Given some replica urls, reads are spread among them and only writes hit the primary.
+    """
 
-def get_session() -> Session:
+    def _create_engine(database_url: str) -> AsyncEngine:
+        url = make_url(database_url)
+        url = url.set(drivername=f"{url.get_backend_name()}+{database_driver}")
+        return create_async_engine(
+            url,
+            poolclass=TimedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+
+    engine = _create_engine(database_url)
+    instrument_engine(engine)
+    replicas = None
+    if replica_urls:
+        replicas = Replicas(
+            [instrument_engine(_create_engine(replica_url)) for replica_url in replica_urls],
+            replica_balancing,
+            replica_pin_seconds,
+        )
+    DBSession.configure(bind=engine, info={"replicas": replicas})
+    return engine
+
+
+async def warm_up_db(connections: int) -> None:
+    """
+    Opens `connections` connections on every bound engine and returns them to the
+    pool, so the first requests find them established instead of connecting.
+    """
+
+    replicas = get_replicas()
+    engines = [get_engine(), *(replicas.engines if replicas else ())]
+    for engine in engines:
+        if engine is None:
+            continue
+        async with AsyncExitStack() as stack:
+            for _ in range(connections):
+                await stack.enter_async_context(engine.connect())
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """Times every statement the engine executes into the database metrics"""
+
+    def before_cursor_execute(_connection, _cursor, _statement, _parameters, context, _many):
+        context.started_at = time.perf_counter()
+
+    def after_cursor_execute(_connection, _cursor, _statement, _parameters, context, _many):
+        observe_db_query(time.perf_counter() - context.started_at)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    return engine
+
+
+async def dispose_db() -> None:
+    """Closes every connection held by the currently bound engines"""
+
+    engine = get_engine()
+    if engine is not None:
+        await engine.dispose()
+    replicas = get_replicas()
+    if replicas is not None:
+        await replicas.dispose()
+
+
+def get_engine() -> AsyncEngine | None:
+    return DBSession.kw.get("bind")
+
+
+def get_replicas() -> Replicas | None:
+    return DBSession.kw.get("info", {}).get("replicas")
+
+
+def get_pool_statistics() -> dict:
+    """Usage of the connection pool owned by this worker"""
+
+    engine = get_engine()
+    if engine is None or not isinstance(engine.pool, TimedQueuePool):
+        return {}
+    return engine.pool.statistics()
+
+
+def get_session() -> AsyncSession:
     return DBSession()
@@ -0,0 +1,35 @@
+"""Connection pool instrumentation"""
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that accumulates how long checkouts wait for a connection,
+    either for a free one or for a new one to be established.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.checkouts += 1
+            self.wait_time += time.perf_counter() - start
+
+    def statistics(self) -> dict:
+        """Snapshot of the pool usage in this worker"""
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "wait_time": self.wait_time,
+        }
@@ -0,0 +1,81 @@
+"""Capture of the statements sent to the database"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.storage.database import get_engine, get_replicas
+
+
+class CapturedQuery(NamedTuple):
+    statement: str
+    parameters: Any
+    duration: float
+
+
+class QueryCapture:
+    """Statements executed while capturing, in order, with their duration in seconds"""
+
+    def __init__(self):
+        self.queries: List[CapturedQuery] = []
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    @property
+    def statements(self) -> List[str]:
+        return [query.statement for query in self.queries]
+
+    @property
+    def duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self) -> Dict[str, int]:
+        """
+        Statements executed more than once, whatever their parameters. Seeing the same
+        statement per row of a previous result is the signature of an N+1 problem.
+        """
+
+        counts = Counter(self.statements)
+        return {statement: count for statement, count in counts.items() if count > 1}
+
+    def clear(self) -> None:
+        self.queries.clear()
+
+
+@contextmanager
+def capture_queries(*engines: AsyncEngine) -> Iterator[QueryCapture]:
+    """
+    Records every statement the given engines execute within the block, by default
+    those of the engines bound by init_db, replicas included.
+    """
+
+    if not engines:
+        replicas = get_replicas()
+        engines = tuple(
+            engine
+            for engine in (get_engine(), *(replicas.engines if replicas else ()))
+            if engine is not None
+        )
+
+    capture = QueryCapture()
+
+    def before_cursor_execute(_connection, _cursor, _statement, _parameters, context, _many):
+        context.capture_started_at = time.perf_counter()
+
+    def after_cursor_execute(_connection, _cursor, statement, parameters, context, _many):
+        duration = time.perf_counter() - context.capture_started_at
+        capture.queries.append(CapturedQuery(statement, parameters, duration))
+
+    for engine in engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield capture
+    finally:
+        for engine in engines:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+            event.remove(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
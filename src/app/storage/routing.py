@@ -0,0 +1,125 @@
+"""Read replica routing"""
+import itertools
+import math
+import time
+from typing import List
+
+from sqlalchemy import UpdateBase
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+LAST_WRITE_COOKIE = "last_write"
+
+
+class Replicas:
+    """
+    Read only engines in front of the primary one. Clients that wrote within the
+    last `pin_seconds` keep reading from the primary, long enough for the replicas
+    to catch up and for clients to always read their own writes.
+    """
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        balancing: str = ROUND_ROBIN,
+        pin_seconds: float = 5,
+    ):
+        if balancing not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica balancing: {balancing}")
+
+        self.engines = engines
+        self.balancing = balancing
+        self.pin_seconds = pin_seconds
+        self._cycle = itertools.cycle(engines)
+
+    def choose(self) -> AsyncEngine:
+        """Replica engine that serves the next read"""
+
+        if self.balancing == LEAST_CONNECTIONS:
+            return min(self.engines, key=lambda engine: engine.pool.checkedout())
+        return next(self._cycle)
+
+    def wrote_recently(self, last_write: float | None) -> bool:
+        """
+        Whether a write at the `last_write` unix time still pins reads to the primary.
+        Times come from any worker, so they are wall clock ones rather than monotonic.
+        """
+
+        if last_write is None:
+            return False
+        return 0 <= time.time() - last_write < self.pin_seconds
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+class RoutingSession(Session):
+    """
+    Session sending reads to a replica and writes to the primary bind. Once the
+    session writes, or its client wrote lately according to the `last_write` time in
+    `info`, every statement goes to the primary. The time of its last write is left
+    in `info["wrote_at"]` for the client to send back. Without replicas in `info` it
+    behaves like a plain session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        replicas: Replicas | None = self.info.get("replicas")
+        if replicas is None:
+            return primary
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote_at"] = time.time()
+            self.info["pinned"] = True
+            return primary
+        if self.info.get("pinned"):
+            return primary
+        if replicas.wrote_recently(self.info.get("last_write")):
+            self.info["pinned"] = True
+            return primary
+        return replicas.choose().sync_engine
+
+
+def parse_last_write(cookie: str | None) -> float | None:
+    try:
+        return float(cookie) if cookie else None
+    except ValueError:
+        return None
+
+
+class LastWriteCookieMiddleware:
+    """
+    ASGI middleware handing the time of the last write of a request back to its
+    client in a cookie. Whichever worker serves the following requests reads it and
+    keeps them on the primary, no matter how many clients share an address.
+    The request session is expected in `request.state.db_session`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                session = scope.get("state", {}).get("db_session")
+                replicas: Replicas | None = session.info.get("replicas") if session else None
+                wrote_at = session.info.get("wrote_at") if session else None
+                if replicas is not None and wrote_at is not None:
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{LAST_WRITE_COOKIE}={wrote_at:.3f}; "
+                        f"Max-Age={math.ceil(replicas.pin_seconds)}; "
+                        "Path=/; HttpOnly; SameSite=lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
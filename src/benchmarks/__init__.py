@@ -0,0 +1,18 @@
+"""
+Benchmark scripts, run them as modules from the src directory.
+
+Benchmarks run against the database configured through the environment, or
+against a throwaway SQLite file through the aiosqlite driver when there is none.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+BENCH_DIRECTORY = Path(tempfile.mkdtemp(prefix="app-bench-"))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIRECTORY / 'bench.db'}")
+os.environ.setdefault("DATABASE_DRIVER", "aiosqlite")
+os.environ.setdefault("SECRET_KEY", "not-a-secure-secret-key")
+os.environ.setdefault("ALLOWED_ORIGINS", '["http://testserver"]')
+os.environ.setdefault("ALLOWED_HOSTS", '["*"]')
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
@@ -0,0 +1,79 @@
+"""JSON baselines of benchmark results and the regression check against them"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+BASELINES_DIRECTORY = Path(__file__).parent / "baselines"
+
+# Metrics where a bigger value is an improvement, any other one should go down
+HIGHER_IS_BETTER = {"rps"}
+
+Results = Dict[str, Dict[str, float]]
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative change of any metric tolerated before failing, 0.2 by default",
+    )
+
+
+def baseline_path(name: str) -> Path:
+    return BASELINES_DIRECTORY / f"{name}.json"
+
+
+def save_baseline(name: str, results: Results) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_baseline(name: str) -> Results | None:
+    path = baseline_path(name)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def find_regressions(baseline: Results, results: Results, threshold: float) -> List[str]:
+    """Describes every metric that got worse than the baseline by more than the threshold"""
+
+    regressions = []
+    for case, metrics in baseline.items():
+        for metric, expected in metrics.items():
+            measured = results.get(case, {}).get(metric)
+            if measured is None or not expected:
+                continue
+            change = (measured - expected) / expected
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{case} {metric}: {measured:.2f} against {expected:.2f} ({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def check_baseline(name: str, results: Results, args: argparse.Namespace) -> int:
+    """Saves or compares the results as asked on the command line, returns the exit code"""
+
+    if args.save:
+        print(f"baseline saved to {save_baseline(name, results)}")
+        return 0
+
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"no baseline at {baseline_path(name)}, store one with --save")
+        return 0
+
+    regressions = find_regressions(baseline, results, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"no regressions over {args.threshold:.0%} against {baseline_path(name)}")
+    return 1 if regressions else 0
@@ -0,0 +1,79 @@
+"""
+Users per second created through /signup one by one against /users/bulk.
+
+bcrypt is set to its minimum cost for both paths so the comparison shows the
+request and database overhead rather than the configured hashing cost. The
+insert throughput of DBInterface.create_many alone, with passwords already
+hashed, is reported too since on few cores hashing bounds the bulk endpoint.
+
+    python -m benchmarks.bench_bulk_create
+"""
+import asyncio
+import time
+import uuid
+
+from app.libs.crypt import crypt
+from app.libs.crypt.hasher import init_hasher, shutdown_hasher
+from app.services.db_interface import DBInterface
+from app.settings import settings
+from app.storage.database import get_session
+from app.storage.models import DBUser
+from benchmarks.common import app_client, login, setup_database
+
+SIGNUPS = 200
+BULK_USERS = 5_000
+
+
+def random_users(count: int) -> list:
+    prefix = uuid.uuid4().hex[:8]
+    return [
+        {
+            "name": f"{prefix}-{index}",
+            "email": f"{prefix}-{index}@example.com",
+            "password": "a-super-secret-password",
+            "role": "user",
+        }
+        for index in range(count)
+    ]
+
+
+async def main() -> None:
+    setup_database()
+    crypt.configure_pwd_context(crypt.MIN_BCRYPT_ROUNDS)
+    init_hasher(
+        settings.password_hasher_workers,
+        settings.password_hasher_max_pending,
+        bcrypt_rounds=crypt.MIN_BCRYPT_ROUNDS,
+    )
+    async with app_client() as client:
+        headers = await login(client)
+
+        start = time.perf_counter()
+        for user in random_users(SIGNUPS):
+            response = await client.post("/signup", json=user)
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"/signup      {SIGNUPS:>6} users {SIGNUPS / elapsed:10.1f} users/s")
+
+        start = time.perf_counter()
+        response = await client.post("/users/bulk", json=random_users(BULK_USERS), headers=headers)
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        created = response.json()["created"]
+        print(f"/users/bulk  {created:>6} users {created / elapsed:10.1f} users/s")
+
+        hashed_password = crypt.hash_password("a-super-secret-password")
+        users_data = [
+            {**user, "id": uuid.uuid4(), "password": hashed_password}
+            for user in random_users(BULK_USERS)
+        ]
+        async with get_session() as session:
+            start = time.perf_counter()
+            created = len(await DBInterface(DBUser, session).create_many(users_data, ["id"]))
+            elapsed = time.perf_counter() - start
+        print(f"create_many  {created:>6} users {created / elapsed:10.1f} users/s")
+    shutdown_hasher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
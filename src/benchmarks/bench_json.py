@@ -0,0 +1,70 @@
+"""
+Cost of rendering a page of 10k users through FastAPI's generic path, jsonable_encoder
+plus a JSON response, against FastJSONResponse serializing the models directly.
+
+    python -m benchmarks.bench_json
+"""
+import time
+import tracemalloc
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.libs.responses.fast_json import FastJSONResponse
+from app.schemas.users import Role, User, UsersPage
+
+USERS = 10_000
+ROUNDS = 5
+
+PAGE = UsersPage(
+    users=[
+        User.construct(
+            id=uuid4(),
+            name=f"bench-user-{index:07}",
+            email=f"bench-user-{index:07}@example.com",
+            role=Role.USER,
+        )
+        for index in range(USERS)
+    ],
+    next_cursor=None,
+)
+
+
+def stdlib_json() -> bytes:
+    return JSONResponse(jsonable_encoder(PAGE)).body
+
+
+def encoder_and_orjson() -> bytes:
+    return ORJSONResponse(jsonable_encoder(PAGE)).body
+
+
+def fast_json() -> bytes:
+    return FastJSONResponse(PAGE).body
+
+
+def main() -> None:
+    for name, render in (
+        ("jsonable_encoder + json", stdlib_json),
+        ("jsonable_encoder + orjson", encoder_and_orjson),
+        ("FastJSONResponse", fast_json),
+    ):
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            body = render()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        render()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(
+            f"{name:<28} {len(body) / 1024:8.0f}KiB body"
+            f" {min(timings) * 1000:8.2f}ms {peak / 1024 / 1024:7.2f}MiB allocated"
+        )
+
+
+if __name__ == "__main__":
+    main()
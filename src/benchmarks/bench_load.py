@@ -0,0 +1,125 @@
+"""
+Throughput and latency of the API hot paths under concurrent load. Each endpoint
+is driven on its own by concurrent clients against a seeded database and the
+results are checked against the stored JSON baseline, exiting with 1 when any
+metric regressed more than the threshold.
+
+    python -m benchmarks.bench_load [--concurrency 16] [--scale 1] [--save] [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.baseline import Results, add_baseline_arguments, check_baseline
+from benchmarks.common import (
+    ADMIN_EMAIL,
+    ADMIN_PASSWORD,
+    app_client,
+    login,
+    percentile,
+    seed_users,
+    setup_database,
+)
+
+SEEDED_USERS = 10_000
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def endpoints(headers: dict) -> Dict[str, tuple[int, Request]]:
+    """Requests to send per endpoint, bcrypt bound ones get fewer"""
+
+    def post_login(client: httpx.AsyncClient, _: int):
+        return client.post("/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+
+    def post_signup(client: httpx.AsyncClient, _: int):
+        name = f"load-{uuid.uuid4().hex}"
+        return client.post(
+            "/signup",
+            json={
+                "name": name,
+                "email": f"{name}@example.com",
+                "password": "a-load-test-password",
+                "role": "user",
+            },
+        )
+
+    def get_me(client: httpx.AsyncClient, _: int):
+        return client.get("/users/me", headers=headers)
+
+    def get_users(client: httpx.AsyncClient, _: int):
+        return client.get("/users?limit=100", headers=headers)
+
+    return {
+        "POST /login": (100, post_login),
+        "POST /signup": (100, post_signup),
+        "GET /users/me": (2000, get_me),
+        "GET /users": (500, get_users),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient, request: Request, total: int, concurrency: int
+) -> Dict[str, float]:
+    """Sends `total` requests from `concurrency` clients, all of them must succeed"""
+
+    pending = iter(range(total))
+    latencies: List[float] = []
+
+    async def worker():
+        for index in pending:
+            start = time.perf_counter()
+            response = await request(client, index)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": total / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+async def run(concurrency: int, scale: float) -> Results:
+    setup_database()
+    seed_users(SEEDED_USERS)
+    results: Results = {}
+    async with app_client() as client:
+        headers = await login(client)
+        for name, (requests, request) in endpoints(headers).items():
+            total = max(concurrency, int(requests * scale))
+            await drive(client, request, concurrency, concurrency)  # warm up
+            results[name] = await drive(client, request, total, concurrency)
+            print(
+                f"{name:<16} n={total:<6} {results[name]['rps']:9.1f} req/s"
+                f" p50={results[name]['p50']:8.2f}ms"
+                f" p95={results[name]['p95']:8.2f}ms"
+                f" p99={results[name]['p99']:8.2f}ms"
+            )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--scale", type=float, default=1, help="multiplies the requests sent per endpoint"
+    )
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.concurrency, args.scale))
+    return check_baseline("load", results, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Latency of /status while a burst of logins is being processed.
+
+bcrypt runs in the password hasher pool, so the event loop keeps answering
+/status while the logins wait for a worker or get rejected with 503.
+
+    python -m benchmarks.bench_login_burst
+"""
+import asyncio
+
+from app.libs.crypt.hasher import init_hasher, shutdown_hasher
+from app.settings import settings
+from benchmarks.common import (
+    ADMIN_EMAIL,
+    ADMIN_PASSWORD,
+    app_client,
+    report,
+    setup_database,
+    timed_get,
+)
+
+LOGINS = 50
+STATUS_REQUESTS = 200
+
+
+async def measure_status(client) -> list:
+    latencies = []
+    for _ in range(STATUS_REQUESTS):
+        latencies.append(await timed_get(client, "/status", {}))
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def login_burst(client) -> dict:
+    responses = await asyncio.gather(
+        *(
+            client.post("/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+            for _ in range(LOGINS)
+        )
+    )
+    status_codes: dict = {}
+    for response in responses:
+        status_codes[response.status_code] = status_codes.get(response.status_code, 0) + 1
+    return status_codes
+
+
+async def main() -> None:
+    setup_database()
+    init_hasher(
+        settings.password_hasher_workers,
+        settings.password_hasher_max_pending,
+        settings.password_hasher_use_processes,
+    )
+    async with app_client() as client:
+        report("/status", await measure_status(client))
+
+        burst = asyncio.create_task(login_burst(client))
+        latencies = await measure_status(client)
+        status_codes = await burst
+        report(f"/status during {LOGINS} logins", latencies)
+        print(f"login responses: {status_codes}")
+    shutdown_hasher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Microbenchmarks of the building blocks behind the hot paths: password hashing and
+tokens, building User from database rows and the DBInterface methods. Results are
+microseconds per call, checked against the stored JSON baseline.
+
+    python -m benchmarks.bench_micro [--save] [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from app.controllers.users import USER_FIELDS
+from app.libs.crypt import crypt
+from app.schemas.users import User
+from app.services.db_interface import DBInterface
+from app.settings import settings
+from app.storage.database import dispose_db, get_session, init_db
+from app.storage.models import DBUser
+from benchmarks.baseline import Results, add_baseline_arguments, check_baseline
+from benchmarks.common import ADMIN_EMAIL, seed_users, setup_database
+
+SEEDED_USERS = 10_000
+
+
+def measure(function: Callable, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def measure_async(function: Callable[[], Awaitable], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await function()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def crypt_cases() -> Results:
+    password_hash = crypt.hash_password("a-benchmark-password")
+    token = crypt.create_access_token(
+        {"sub": str(uuid.uuid4())},
+        settings.access_token_expire_minutes,
+        settings.secret_key,
+        settings.algorithm,
+    ).access_token
+
+    return {
+        "crypt.hash_password": {"us": measure(lambda: crypt.hash_password("password"), 5)},
+        "crypt.verify_password": {
+            "us": measure(lambda: crypt.verify_password("password", password_hash), 5)
+        },
+        "crypt.create_access_token": {
+            "us": measure(
+                lambda: crypt.create_access_token(
+                    {"sub": "id"},
+                    settings.access_token_expire_minutes,
+                    settings.secret_key,
+                    settings.algorithm,
+                ),
+                5000,
+            )
+        },
+        "crypt.decode_access_token": {
+            "us": measure(
+                lambda: crypt.decode_access_token(token, settings.secret_key, settings.algorithm),
+                5000,
+            )
+        },
+    }
+
+
+async def storage_cases() -> Results:
+    results: Results = {}
+    async with get_session() as session:
+        users_interface = DBInterface(DBUser, session)
+        user_db = await users_interface.read_by_field("email", ADMIN_EMAIL)
+        row = await users_interface.read_by_field("email", ADMIN_EMAIL, USER_FIELDS)
+
+        results["User.from_orm"] = {"us": measure(lambda: User.from_orm(user_db), 20_000)}
+        results["User.construct"] = {"us": measure(lambda: User.construct(**row), 20_000)}
+
+        cases: dict = {
+            "DBInterface.read_by_id": lambda: users_interface.read_by_id(user_db.id),
+            "DBInterface.read_by_id projected": lambda: users_interface.read_by_id(
+                user_db.id, USER_FIELDS
+            ),
+            "DBInterface.read_by_field": lambda: users_interface.read_by_field(
+                "email", ADMIN_EMAIL, USER_FIELDS
+            ),
+            "DBInterface.read_page 100": lambda: users_interface.read_page(
+                ["name", "id"], 100, fields=USER_FIELDS
+            ),
+            "DBInterface.update": lambda: users_interface.update(
+                user_db.id, {"role": user_db.role}, ["id"]
+            ),
+        }
+        for name, case in cases.items():
+            session.expunge_all()
+            results[name] = {"us": await measure_async(case, 500)}
+    return results
+
+
+async def run() -> Results:
+    setup_database()
+    seed_users(SEEDED_USERS)
+    init_db(settings.database_url, settings.database_driver)
+    try:
+        results = {**crypt_cases(), **await storage_cases()}
+    finally:
+        await dispose_db()
+
+    for name, metrics in results.items():
+        print(f"{name:<36} {metrics['us']:12.2f}us")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    return check_baseline("micro", asyncio.run(run()), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
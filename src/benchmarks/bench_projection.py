@@ -0,0 +1,51 @@
+"""
+Per row cost of listing users as full ORM entities converted with User.from_orm
+against reading only the public columns and building User straight from them.
+
+    python -m benchmarks.bench_projection
+"""
+import asyncio
+import time
+
+from app.controllers.users import USER_FIELDS
+from app.schemas.users import User
+from app.services.db_interface import DBInterface
+from app.settings import settings
+from app.storage.database import dispose_db, get_session, init_db
+from app.storage.models import DBUser
+from benchmarks.common import seed_users, setup_database
+
+ROWS = 100_000
+ROUNDS = 3
+
+
+async def list_entities(users_interface: DBInterface) -> list:
+    users_db = await users_interface.read_page(["name", "id"], ROWS)
+    return [User.from_orm(user) for user in users_db]
+
+
+async def list_projected(users_interface: DBInterface) -> list:
+    users_db = await users_interface.read_page(["name", "id"], ROWS, fields=USER_FIELDS)
+    return [User.construct(**user) for user in users_db]
+
+
+async def main() -> None:
+    setup_database()
+    seed_users(ROWS)
+    init_db(settings.database_url, settings.database_driver)
+
+    for name, listing in (("entities + from_orm", list_entities), ("projected", list_projected)):
+        timings = []
+        for _ in range(ROUNDS):
+            async with get_session() as session:
+                start = time.perf_counter()
+                users = await listing(DBInterface(DBUser, session))
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{name:<22} {len(users)} rows in {best:6.2f}s {best / len(users) * 1e6:7.2f}us/row")
+
+    await dispose_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
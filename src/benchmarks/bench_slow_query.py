@@ -0,0 +1,75 @@
+"""
+Latency of /users/me with and without a deliberately slow query running concurrently.
+
+With the async storage engine the slow statement waits on its own connection and
+the event loop keeps serving /users/me, so p99 should barely move.
+
+    python -m benchmarks.bench_slow_query
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.settings import settings
+from app.storage.database import DBSession
+from benchmarks.common import app_client, login, report, setup_database, timed_get
+
+REQUESTS = 500
+CONCURRENCY = 10
+
+SLOW_QUERIES = {
+    "postgresql": text("SELECT pg_sleep(1)"),
+    "sqlite": text(
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 3000000) "
+        "SELECT count(*) FROM c"
+    ),
+}
+
+
+async def run_slow_queries(stop: asyncio.Event) -> int:
+    """Keeps a slow query in flight until asked to stop"""
+
+    backend = settings.database_url.split(":", 1)[0].split("+", 1)[0]
+    executed = 0
+    async with DBSession() as session:
+        while not stop.is_set():
+            await session.execute(SLOW_QUERIES[backend])
+            executed += 1
+    return executed
+
+
+async def measure(client, headers) -> list:
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(None)
+    latencies = []
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            latencies.append(await timed_get(client, "/users/me", headers))
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return latencies
+
+
+async def main() -> None:
+    setup_database()
+    async with app_client() as client:
+        headers = await login(client)
+        await measure(client, headers)  # warm up
+
+        report("/users/me", await measure(client, headers))
+
+        stop = asyncio.Event()
+        slow = asyncio.create_task(run_slow_queries(stop))
+        await asyncio.sleep(0.1)
+        latencies = await measure(client, headers)
+        stop.set()
+        executed = await slow
+        report(f"/users/me + slow query ({executed} run)", latencies)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+"""
+Microbenchmark of the token verification step of get_current_user with and
+without the verified JWT cache.
+
+    python -m benchmarks.bench_token_cache
+"""
+import timeit
+from uuid import uuid4
+
+from app.controllers import auth
+from app.libs.crypt import crypt
+from app.libs.crypt.token_cache import get_token_cache, init_token_cache
+from app.settings import settings
+
+ITERATIONS = 20_000
+
+
+def main() -> None:
+    token = crypt.create_access_token(
+        {"sub": str(uuid4())},
+        settings.access_token_expire_minutes,
+        settings.secret_key,
+        settings.algorithm,
+    ).access_token
+
+    for name, cache_size in (("uncached", 0), ("cached", settings.token_cache_size)):
+        init_token_cache(cache_size)
+        elapsed = timeit.timeit(lambda: auth.decode_token(token), number=ITERATIONS)
+        print(
+            f"{name:<10} {elapsed / ITERATIONS * 1_000_000:8.2f}us per call"
+            f" {get_token_cache().statistics()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput of /users/me served by the production server (app.server) as the number
+of workers grows, over real sockets with keep-alive connections.
+
+    python -m benchmarks.bench_workers [--workers 1 2 4] [--requests 5000] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, percentile, setup_database
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(PORT),
+        "SERVER_WORKERS": str(workers),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{BASE_URL}/status").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=30)
+
+
+async def measure(requests: int, concurrency: int) -> tuple:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits) as client:
+        response = await client.post(
+            "/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        pending = iter(range(requests))
+        latencies = []
+
+        async def worker():
+            for _ in pending:
+                start = time.perf_counter()
+                response = await client.get("/users/me", headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))  # warm up
+        pending = iter(range(requests))
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start), latencies
+
+
+def main() -> None:
+    cpus = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, cpus, cpus * 2}))
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    setup_database()
+    print(f"{cpus} CPUs")
+    for workers in args.workers:
+        server = start_server(workers)
+        try:
+            rps, latencies = asyncio.run(measure(args.requests, args.concurrency))
+        finally:
+            stop_server(server)
+        print(
+            f"workers={workers:<3} {rps:9.1f} req/s"
+            f" p50={percentile(latencies, 50):8.2f}ms p99={percentile(latencies, 99):8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Helpers shared by the benchmark scripts"""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+from uuid import UUID, uuid4
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from app.libs.rate_limit.buckets import init_rate_limiter
+from app.main import app
+from app.schemas.users import Role
+from app.settings import settings
+from app.storage.database import dispose_db, init_db
+from app.storage.models import Base, DBUser
+
+ADMIN_EMAIL = "pepe@example.com"
+ADMIN_PASSWORD = "secret"
+
+
+def setup_database() -> None:
+    """Creates the schema and the default admin user on a SQLite database"""
+
+    if not settings.database_url.startswith("sqlite"):
+        return
+
+    engine = create_engine(settings.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(DBUser),
+            [
+                {
+                    "id": UUID("765bdd21-71bc-4869-9b31-bd37ef84284c"),
+                    "name": "pepe",
+                    "password": "$2b$12$ls.cL.bbv0VXgPH36DJX9uLU.Q2j2R9dWtQcJ/SCXmJNhGQ3s.zpW",
+                    "email": ADMIN_EMAIL,
+                    "role": Role.ADMIN,
+                }
+            ],
+        )
+    engine.dispose()
+
+
+def seed_users(count: int, prefix: str = "bench-user-") -> None:
+    """Inserts `count` users with a fake password hash on a SQLite database"""
+
+    if not settings.database_url.startswith("sqlite"):
+        return
+
+    engine = create_engine(settings.database_url)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(DBUser),
+            [
+                {
+                    "id": uuid4(),
+                    "name": f"{prefix}{index:07}",
+                    "password": "$2b$12$" + "x" * 53,
+                    "email": f"{prefix}{index:07}@example.com",
+                    "role": Role.USER,
+                }
+                for index in range(count)
+            ],
+        )
+    engine.dispose()
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Yields a client driving the ASGI app in-process with the database initialised"""
+
+    init_db(settings.database_url, settings.database_driver)
+    init_rate_limiter(settings.rate_limit_enabled)
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+            yield client
+    finally:
+        await dispose_db()
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    """Logs the default admin user in and returns the authorization headers"""
+
+    response = await client.post(
+        "/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, headers: dict) -> float:
+    """Requests an url and returns the elapsed time in milliseconds"""
+
+    start = time.perf_counter()
+    response = await client.get(url, headers=headers)
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def report(name: str, latencies: List[float]) -> None:
+    print(
+        f"{name:<40} n={len(latencies):<6}"
+        f" p50={percentile(latencies, 50):8.2f}ms"
+        f" p99={percentile(latencies, 99):8.2f}ms"
+        f" max={max(latencies):8.2f}ms"
+    )
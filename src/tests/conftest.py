@@ -0,0 +1,74 @@
+"""
+Test configuration.
+
+When no database is configured through the environment the suite runs against
+a throwaway SQLite file through the aiosqlite async driver.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager
+from uuid import UUID
+
+import pytest
+from sqlalchemy import create_engine, insert
+
+TEST_DIRECTORY = Path(tempfile.mkdtemp(prefix="app-tests-"))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DIRECTORY / 'test.db'}")
+os.environ.setdefault("DATABASE_DRIVER", "aiosqlite")
+os.environ.setdefault("SECRET_KEY", "not-a-secure-secret-key")
+os.environ.setdefault("ALLOWED_ORIGINS", '["http://testserver"]')
+os.environ.setdefault("ALLOWED_HOSTS", '["*"]')
+
+# pylint: disable=wrong-import-position
+from app.schemas.users import Role
+from app.settings import settings
+from app.storage.models import Base, DBUser
+from app.storage.query_capture import QueryCapture, capture_queries
+
+DEFAULT_USER = {
+    "id": UUID("765bdd21-71bc-4869-9b31-bd37ef84284c"),
+    "name": "pepe",
+    # password = secret
+    "password": "$2b$12$ls.cL.bbv0VXgPH36DJX9uLU.Q2j2R9dWtQcJ/SCXmJNhGQ3s.zpW",
+    "email": "pepe@example.com",
+    "role": Role.ADMIN,
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def sqlite_database():
+    """Creates the schema and default data that docker/data/postgres-init.sql provides"""
+
+    if not settings.database_url.startswith("sqlite"):
+        yield
+        return
+
+    engine = create_engine(settings.database_url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(DBUser), [DEFAULT_USER])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., ContextManager[QueryCapture]]:
+    """
+    Fails the test when the block executes more statements than its budget, or the
+    same statement more than once unless repeats are allowed. The app must be started.
+    """
+
+    @contextmanager
+    def _query_budget(max_queries: int, allow_repeated: bool = False):
+        with capture_queries() as capture:
+            yield capture
+        assert (
+            len(capture) <= max_queries
+        ), f"{len(capture)} statements over a budget of {max_queries}: {capture.statements}"
+        assert allow_repeated or not capture.repeated(), f"Repeated: {capture.repeated()}"
+
+    return _query_budget
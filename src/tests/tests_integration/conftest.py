@@ -0,0 +1,15 @@
+"""Fixtures shared by the integration tests"""
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client() -> Generator[TestClient, None, None]:
+    """Client of the app, started and shut down around each test"""
+
+    with TestClient(app) as cli:
+        yield cli
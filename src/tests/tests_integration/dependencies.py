@@ -1,7 +1,29 @@
 """Helper functions for Tests"""
 import random
 import string
+from typing import Dict
+
+from fastapi.testclient import TestClient
+from requests.models import Response
+
+DEFAULT_EMAIL = "pepe@example.com"
+DEFAULT_PASSWORD = "secret"
 
 
 def get_random_user_name() -> str:
     return "".join(random.choice(string.ascii_letters) for _ in range(10))
+
+
+def login(
+    client: TestClient, email: str = DEFAULT_EMAIL, password: str = DEFAULT_PASSWORD
+) -> Response:
+    return client.post("/login", data={"username": email, "password": password})
+
+
+def auth_headers(
+    client: TestClient, email: str = DEFAULT_EMAIL, password: str = DEFAULT_PASSWORD
+) -> Dict[str, str]:
+    """Authorization header of a fresh token for the user, the default admin by default"""
+
+    response = login(client, email, password)
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -12,3 +12,36 @@ class TestAPI:
         response = self.client.get("/status")
         assert response.status_code == 200
         assert response.json() == {"Hello": "World"}
+
+    def test_pool_status(self):
+        with TestClient(app) as client:
+            client.post("/login", data={"username": "pepe@example.com", "password": "secret"})
+            response = client.get("/status/pool")
+
+        assert response.status_code == 200
+        assert response.json()["checkouts"] >= 1
+        assert response.json()["checked_out"] == 0
+        assert response.json()["idle"] >= 1
+
+    def test_metrics(self):
+        user = {"username": "pepe@example.com", "password": "secret"}
+        with TestClient(app) as client:
+            token = client.post("/login", data=user).json()["access_token"]
+            client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert (
+            'app_request_duration_seconds_count{method="GET",route="/users/me",status="200"}'
+            in response.text
+        )
+        assert 'app_request_db_queries_sum{route="/users/me"} 1.0' in response.text
+        assert 'app_requests_in_flight{method="GET"} 1' in response.text
+        for counter in (
+            "app_db_queries_total",
+            "app_bcrypt_seconds_total",
+            "app_jwt_decodes_total",
+        ):
+            line = next(line for line in response.text.splitlines() if line.startswith(counter))
+            assert float(line.split()[-1]) > 0
@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.storage.models import DBUser
+from app.storage.query_capture import capture_queries
+
+from .dependencies import login
+
+
+def test_users_table_has_no_redundant_indexes():
+    assert not DBUser.__table__.indexes
+
+
+def test_login_ignores_email_case(client: TestClient):
+    response = login(client, "PePe@Example.COM")
+
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+
+def test_signup_rejects_email_differing_in_case(client: TestClient):
+    response = client.post(
+        "/signup",
+        json={
+            "name": "case-duplicate",
+            "email": "PEPE@example.com",
+            "role": "user",
+            "password": "secret",
+        },
+    )
+
+    assert response.status_code == 400
+
+
+def test_signup_stores_email_lowercased(client: TestClient):
+    response = client.post(
+        "/signup",
+        json={
+            "name": "lowercased-email",
+            "email": "Lowercased.Email@Example.com",
+            "role": "user",
+            "password": "secret",
+        },
+    )
+    assert response.status_code == 201
+
+    response = login(client, "lowercased.email@EXAMPLE.com")
+    assert response.status_code == 200
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert (
+        client.get("/users/me", headers=headers).json()["email"] == "lowercased.email@example.com"
+    )
+    client.delete("/users/me", headers=headers)
+
+
+def test_login_lookup_uses_email_index(client: TestClient, sqlite_database):
+    if sqlite_database is None:
+        pytest.skip("The query plan is checked against SQLite")
+
+    with capture_queries() as capture:
+        assert login(client, "PEPE@example.com").status_code == 200
+
+    lookup = next(query for query in capture.queries if query.statement.startswith("SELECT"))
+    assert "WHERE users.email = ?" in lookup.statement
+
+    with sqlite_database.connect() as connection:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {lookup.statement}", lookup.parameters
+        ).all()
+
+    (detail,) = [row[-1] for row in plan]
+    assert detail.startswith("SEARCH users USING"), detail
+    assert "INDEX sqlite_autoindex_users_" in detail and detail.endswith("(email=?)"), detail
@@ -0,0 +1,47 @@
+import pstats
+from typing import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.libs.metrics.profiling import ProfilingMiddleware
+from app.main import app
+
+
+@pytest.fixture
+def profiled_client(tmp_path) -> Callable[..., TestClient]:
+    """Client of the app behind a ProfilingMiddleware saving its profiles in tmp_path"""
+
+    def _profiled_client(**options) -> TestClient:
+        return TestClient(ProfilingMiddleware(app, directory=str(tmp_path), **options))
+
+    return _profiled_client
+
+
+def test_profiles_requests_with_the_secret_header(profiled_client, tmp_path):
+    with profiled_client(secret="let-me-profile") as client:
+        client.get("/status")
+        client.get("/status", headers={"X-Profile": "wrong-secret"})
+        response = client.get("/status/pool", headers={"X-Profile": "let-me-profile"})
+
+    assert response.status_code == 200
+    profiles = list(tmp_path.iterdir())
+    assert len(profiles) == 1
+    assert "-GET-status_pool-" in profiles[0].name
+    assert pstats.Stats(str(profiles[0])).total_calls > 0
+
+
+def test_non_ascii_secret_header_is_not_profiled(profiled_client, tmp_path):
+    with profiled_client(secret="let-me-profile") as client:
+        response = client.get("/status", headers={"X-Profile": "l\u00e9t-me-profile"})
+
+    assert response.status_code == 200
+    assert not list(tmp_path.iterdir())
+
+
+def test_samples_requests(profiled_client, tmp_path):
+    with profiled_client(sample_rate=1) as client:
+        client.get("/status")
+        client.get("/status")
+
+    assert len(list(tmp_path.iterdir())) == 2
@@ -0,0 +1,112 @@
+"""Statements every route may execute, a change adding round trips has to update them"""
+from typing import Callable, Dict, Tuple
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.storage.query_capture import capture_queries
+
+from .dependencies import auth_headers, get_random_user_name
+
+Context = Dict[str, str]
+# (method, route path) -> (statements allowed, request arguments for the context)
+ROUTE_BUDGETS: Dict[Tuple[str, str], Tuple[int, Callable[[Context], dict]]] = {
+    ("GET", "/status"): (0, lambda _: {}),
+    ("GET", "/status/pool"): (0, lambda _: {}),
+    ("GET", "/status/token-cache"): (0, lambda _: {}),
+    ("GET", "/status/startup"): (0, lambda _: {}),
+    ("GET", "/metrics"): (0, lambda _: {}),
+    ("POST", "/login"): (
+        1,
+        lambda context: {"data": {"username": context["email"], "password": "secret"}},
+    ),
+    ("POST", "/signup"): (
+        1,
+        lambda context: {"json": new_user_data()},
+    ),
+    ("GET", "/users/me"): (1, lambda context: {"headers": context["user_headers"]}),
+    ("PATCH", "/users/me"): (
+        2,
+        lambda context: {"headers": context["user_headers"], "json": {"name": context["name"]}},
+    ),
+    ("DELETE", "/users/me"): (2, lambda context: {"headers": context["user_headers"]}),
+    ("GET", "/users"): (2, lambda context: {"headers": context["admin_headers"]}),
+    ("GET", "/users/export"): (2, lambda context: {"headers": context["admin_headers"]}),
+    ("POST", "/users/bulk"): (
+        2,
+        lambda context: {
+            "headers": context["admin_headers"],
+            "json": [new_user_data(), new_user_data()],
+        },
+    ),
+    ("DELETE", "/users"): (
+        2,
+        lambda context: {
+            "headers": context["admin_headers"],
+            "params": {"name_prefix": context["name"]},
+        },
+    ),
+    ("PATCH", "/users/{user_id}"): (
+        2,
+        lambda context: {"headers": context["admin_headers"], "json": {"role": "guest"}},
+    ),
+}
+
+
+def new_user_data() -> dict:
+    name = get_random_user_name()
+    return {"name": name, "email": f"{name}@example.com", "password": "secret", "role": "user"}
+
+
+@pytest.fixture
+def context(client: TestClient) -> Context:
+    """A freshly signed up user along with the admin credentials"""
+
+    user = new_user_data()
+    client.post("/signup", json=user)
+    user_headers = auth_headers(client, user["email"])
+    user_id = client.get("/users/me", headers=user_headers).json()["id"]
+    return {
+        "email": user["email"],
+        "name": user["name"],
+        "user_id": user_id,
+        "user_headers": user_headers,
+        "admin_headers": auth_headers(client),
+    }
+
+
+def test_every_route_has_a_budget():
+    routes = {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+    assert routes == set(ROUTE_BUDGETS)
+
+
+@pytest.mark.parametrize("method, path", ROUTE_BUDGETS)
+def test_route_stays_within_query_budget(
+    client: TestClient, context: Context, query_budget, method: str, path: str
+):
+    budget, arguments = ROUTE_BUDGETS[(method, path)]
+
+    with query_budget(budget):
+        response = client.request(
+            method, path.format(user_id=context["user_id"]), **arguments(context)
+        )
+
+    assert response.status_code < 400
+
+
+def test_repeated_statements_are_flagged(client: TestClient, context: Context):
+    with capture_queries() as capture:
+        for _ in range(3):
+            client.get("/users/me", headers=context["user_headers"])
+
+    assert len(capture) == 3
+    assert list(capture.repeated().values()) == [3]
+    assert capture.duration > 0
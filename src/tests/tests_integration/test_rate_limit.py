@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.controllers import auth
+from app.settings import settings
+
+from .dependencies import login
+
+WRONG_PASSWORD = "wrong-password"
+
+
+@pytest.fixture
+def authentications(monkeypatch) -> list:
+    """Records the emails whose password gets verified"""
+
+    emails: list = []
+    authenticate_user = auth.authenticate_user
+
+    async def _authenticate_user(user, users_interface):
+        emails.append(user.email)
+        return await authenticate_user(user, users_interface)
+
+    monkeypatch.setattr(auth, "authenticate_user", _authenticate_user)
+    return emails
+
+
+def test_login_is_throttled_per_email(client: TestClient, authentications: list, monkeypatch):
+    monkeypatch.setattr(settings, "login_rate_limit_per_email", 2)
+
+    assert [login(client, password=WRONG_PASSWORD).status_code for _ in range(3)] == [403, 403, 429]
+    response = login(client, "PEPE@example.com")
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert authentications == ["pepe@example.com"] * 2
+    assert login(client, "someone@example.com", WRONG_PASSWORD).status_code == 403
+
+
+def test_login_is_throttled_per_ip(client: TestClient, authentications: list, monkeypatch):
+    monkeypatch.setattr(settings, "login_rate_limit_per_ip", 2)
+
+    statuses = [
+        login(client, f"user-{index}@example.com", WRONG_PASSWORD).status_code for index in range(3)
+    ]
+
+    assert statuses == [403, 403, 429]
+    assert len(authentications) == 2
@@ -0,0 +1,105 @@
+import uuid
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+
+from app.main import app
+from app.schemas.users import Role
+from app.settings import settings
+from app.storage.database import get_replicas
+from app.storage.models import Base, DBUser
+
+from ..conftest import DEFAULT_USER, TEST_DIRECTORY
+from .dependencies import auth_headers, get_random_user_name
+
+REPLICA_ONLY_USER = {
+    "id": uuid.uuid4(),
+    "name": "replica-only",
+    "password": "not-a-real-hash",
+    "email": "replica-only@example.com",
+    "role": Role.USER,
+}
+
+
+@pytest.fixture
+def replica_database(sqlite_database):
+    """Second SQLite file standing in for a replica that lags behind the primary"""
+
+    if sqlite_database is None:
+        pytest.skip("Replicas are emulated with SQLite files")
+
+    replica_path = TEST_DIRECTORY / "replica.db"
+    engine = create_engine(f"sqlite:///{replica_path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(DBUser), [DEFAULT_USER, REPLICA_ONLY_USER])
+    yield engine
+    engine.dispose()
+    replica_path.unlink()
+
+
+@pytest.fixture
+def replica_client(replica_database, monkeypatch) -> Generator[TestClient, None, None]:
+    monkeypatch.setattr(settings, "database_replica_urls", [str(replica_database.url)])
+    with TestClient(app) as cli:
+        yield cli
+
+
+def test_reads_go_to_replicas(replica_client: TestClient):
+    response = replica_client.get(
+        "/users?name_prefix=replica", headers=auth_headers(replica_client)
+    )
+
+    assert response.status_code == 200
+    assert [user["name"] for user in response.json()["users"]] == ["replica-only"]
+
+
+def test_clients_read_their_own_writes(replica_client: TestClient, replica_database):
+    headers = auth_headers(replica_client)
+    name = get_random_user_name()
+
+    response = replica_client.post(
+        "/signup",
+        json={"name": name, "email": f"{name}@example.com", "password": "secret", "role": "user"},
+    )
+    assert response.status_code == 201
+
+    listing = replica_client.get(f"/users?name_prefix={name}", headers=headers).json()
+    assert [user["name"] for user in listing["users"]] == [name]
+    with replica_database.connect() as connection:
+        assert connection.scalar(select(DBUser.id).filter(DBUser.name == name)) is None
+
+    replica_client.cookies.clear()
+    listing = replica_client.get(f"/users?name_prefix={name}", headers=headers).json()
+    assert listing["users"] == []
+
+
+def test_writes_pin_reads_on_every_worker(replica_database, monkeypatch):
+    monkeypatch.setattr(settings, "database_replica_urls", [str(replica_database.url)])
+    name = get_random_user_name()
+
+    with TestClient(app) as first_worker:
+        headers = auth_headers(first_worker)
+        response = first_worker.post(
+            "/signup",
+            json={
+                "name": name,
+                "email": f"{name}@example.com",
+                "password": "secret",
+                "role": "user",
+            },
+        )
+        assert response.status_code == 201
+        first_replicas = get_replicas()
+        cookies = first_worker.cookies
+
+    with TestClient(app) as second_worker:
+        assert get_replicas() is not first_replicas
+        listing = second_worker.get(f"/users?name_prefix={name}", headers=headers).json()
+        assert listing["users"] == [], "another client on the same address is not pinned"
+
+        second_worker.cookies.update(cookies)
+        listing = second_worker.get(f"/users?name_prefix={name}", headers=headers).json()
+        assert [user["name"] for user in listing["users"]] == [name]
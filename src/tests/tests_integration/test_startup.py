@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+# Runs in a fresh interpreter so importing the app is part of the measure
+COLD_START = textwrap.dedent(
+    """
+    import time
+
+    start = time.perf_counter()
+
+    from fastapi.testclient import TestClient
+
+    from app.controllers.auth import encode_user_into_jwt_token
+    from app.main import app
+    from app.schemas.users import User
+    from tests.conftest import DEFAULT_USER
+
+    token = encode_user_into_jwt_token(User(**DEFAULT_USER)).access_token
+    with TestClient(app) as client:
+        response = client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        print(time.perf_counter() - start)
+    """
+)
+
+
+def test_startup_report():
+    with TestClient(app) as client:
+        response = client.get("/status/startup")
+
+    assert response.status_code == 200
+    assert list(response.json()["steps"]) == ["database", "mappers", "crypt", "caches", "openapi"]
+    assert response.json()["total"] >= sum(response.json()["steps"].values())
+
+
+def test_startup_report_without_lifespan(monkeypatch):
+    monkeypatch.delattr(app.state, "startup_report", raising=False)
+
+    response = TestClient(app).get("/status/startup")
+
+    assert response.status_code == 404
+
+
+def test_cold_start_to_first_request():
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        capture_output=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        env=os.environ,
+        text=True,
+    )
+
+    seconds = float(result.stdout.strip().splitlines()[-1])
+    assert seconds < 5, f"import to first /users/me took {seconds * 1000:.0f}ms"
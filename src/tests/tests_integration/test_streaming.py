@@ -0,0 +1,78 @@
+import asyncio
+import tracemalloc
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app.controllers import users
+from app.schemas.users import Role, User, UsersFilter
+from app.services.db_interface import DBInterface
+from app.settings import settings
+from app.storage.database import dispose_db, get_session, init_db
+from app.storage.models import DBUser
+
+USERS = 10_000
+
+
+@pytest.fixture
+def large_users_table(sqlite_database):
+    if sqlite_database is None:
+        pytest.skip("Seeding a large table is only done on the SQLite test database")
+
+    prefix = f"stream-{uuid.uuid4().hex[:8]}-"
+    with sqlite_database.begin() as connection:
+        connection.execute(
+            insert(DBUser),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "name": f"{prefix}{index:06}",
+                    "password": "not-a-real-hash",
+                    "email": f"{prefix}{index:06}@example.com",
+                    "role": Role.USER,
+                }
+                for index in range(USERS)
+            ],
+        )
+    yield prefix
+    with sqlite_database.begin() as connection:
+        connection.execute(delete(DBUser).where(DBUser.name.startswith(prefix)))
+
+
+def peak_memory(function) -> tuple:
+    async def _run():
+        init_db(settings.database_url, settings.database_driver)
+        try:
+            async with get_session() as session:
+                return await function(DBInterface(DBUser, session))
+        finally:
+            await dispose_db()
+
+    tracemalloc.start()
+    try:
+        result = asyncio.run(_run())
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_export_streams_with_flat_memory(large_users_table: str):
+    admin = User(id=uuid.uuid4(), name="admin", email="admin@example.com", role=Role.ADMIN)
+    users_filter = UsersFilter(name_prefix=large_users_table)
+
+    async def _export(users_interface: DBInterface) -> int:
+        exported = 0
+        async for chunk in users.export_ndjson(admin, users_filter, users_interface):
+            exported += chunk.count("\n")
+        return exported
+
+    async def _read_page(users_interface: DBInterface) -> int:
+        page = await users.read_page(admin, users_filter, USERS, None, users_interface)
+        return len(page.users)
+
+    exported, streaming_peak = peak_memory(_export)
+    listed, listing_peak = peak_memory(_read_page)
+
+    assert exported == listed == USERS
+    assert streaming_peak < listing_peak / 3
@@ -1,12 +1,17 @@
-from typing import Callable, Generator
+import base64
+import json
+from typing import Callable, Generator, List
+from uuid import uuid4
 
 import pytest
 from fastapi.testclient import TestClient
 from pydantic import EmailStr
 from requests.models import Response
+from sqlalchemy import event
 
-from app.main import app
 from app.schemas.users import CreateUserData, LoginUserData, Role
+from app.settings import settings
+from app.storage.database import get_engine
 
 from .dependencies import get_random_user_name
 
@@ -17,9 +22,33 @@ DeleteFunction = Callable[[TestClient, str], Response]
 
 
 @pytest.fixture
-def client() -> Generator[TestClient, None, None]:
-    with TestClient(app) as cli:
-        yield cli
+def connection_checkouts(client: TestClient) -> Generator[List[int], None, None]:
+    """Records every connection checked out from the pool while the test runs"""
+
+    checkouts: List[int] = []
+    engine = get_engine().sync_engine  # type: ignore
+
+    def count_checkout(*_):
+        checkouts.append(1)
+
+    event.listen(engine, "checkout", count_checkout)
+    yield checkouts
+    event.remove(engine, "checkout", count_checkout)
+
+
+@pytest.fixture
+def executed_statements(client: TestClient) -> Generator[List[str], None, None]:
+    """Records the SQL of every statement executed while the test runs"""
+
+    statements: List[str] = []
+    engine = get_engine().sync_engine  # type: ignore
+
+    def record_statement(_connection, _cursor, statement, *_):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_statement)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record_statement)
 
 
 @pytest.fixture
@@ -48,7 +77,7 @@ def signup_user() -> SignupFunction:
                 "name": f"{user.name}",
                 "email": f"{user.email}",
                 "password": f"{user.password}",
-                "role": f"{user.role}",
+                "role": user.role.value,
             },
         )
         return response
@@ -223,3 +252,363 @@ def test_admin_can_get_all_users(client: TestClient, login_user: LoginFunction):
     )
 
     assert response.status_code == 200
+
+
+def test_request_checks_out_a_single_connection(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+    connection_checkouts: List[int],
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+    connection_checkouts.clear()
+
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert len(connection_checkouts) == 1
+
+    connection_checkouts.clear()
+    response = delete_user(client, token)
+    assert response.status_code == 204
+    assert len(connection_checkouts) == 1
+
+
+def test_stateless_auth_skips_database(
+    client: TestClient,
+    login_user: LoginFunction,
+    connection_checkouts: List[int],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "stateless_auth", True)
+    token = test_login(client, login_user)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    connection_checkouts.clear()
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "pepe@example.com"
+    assert response.json()["role"] == Role.ADMIN
+    assert not connection_checkouts
+
+    monkeypatch.setattr(settings, "token_claims_version", settings.token_claims_version + 1)
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+    assert len(connection_checkouts) == 1
+
+
+def test_admin_can_page_through_filtered_users(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+):
+    prefix = get_random_user_name()
+    for index in range(3):
+        user: CreateUserData = create_random_user(Role.USER)
+        user.name = f"{prefix}{index}"
+        user.email = EmailStr(f"{prefix}{index}@example.com")
+        signup_user(client, user)
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+
+    response = client.get(f"/users?name_prefix={prefix}&role=user&limit=2", headers=headers)
+    assert response.status_code == 200
+    first_page = response.json()
+    assert [user["name"] for user in first_page["users"]] == [f"{prefix}0", f"{prefix}1"]
+    assert first_page["next_cursor"]
+
+    response = client.get(
+        f"/users?name_prefix={prefix}&role=user&limit=2&cursor={first_page['next_cursor']}",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [user["name"] for user in response.json()["users"]] == [f"{prefix}2"]
+    assert response.json()["next_cursor"] is None
+
+    response = client.get(f"/users?email_prefix={prefix}1@&role=guest", headers=headers)
+    assert response.json()["users"] == []
+
+
+def test_invalid_cursor_is_rejected(client: TestClient, login_user: LoginFunction):
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+    response = client.get("/users?cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("values", [["a", 123], [123, str(uuid4())], ["a"], {"a": 1}])
+def test_crafted_cursor_is_rejected(client: TestClient, login_user: LoginFunction, values):
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+    cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+    response = client.get(f"/users?cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+
+
+def test_admin_can_export_users(client: TestClient, login_user: LoginFunction):
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+    response = client.get("/users/export?name_prefix=pepe", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [user["email"] for user in users] == ["pepe@example.com"]
+
+
+def test_admin_can_bulk_create_users(
+    client: TestClient, create_random_user: RandomUserFunction, login_user: LoginFunction
+):
+    first_user: CreateUserData = create_random_user()
+    second_user: CreateUserData = create_random_user()
+    existing_email = create_random_user()
+    existing_email.email = EmailStr("pepe@example.com")
+    repeated_name = create_random_user()
+    repeated_name.name = first_user.name
+    users_to_create = [first_user, second_user, existing_email, repeated_name]
+
+    response = client.post(
+        "/users/bulk",
+        headers={"Authorization": f"Bearer {test_login(client, login_user)}"},
+        json=[{**user.dict(), "role": user.role.value} for user in users_to_create],
+    )
+
+    assert response.status_code == 201
+    assert response.json()["created"] == 2
+    assert [conflict["index"] for conflict in response.json()["conflicts"]] == [2, 3]
+    test_login(client, login_user, username=second_user.email, password=second_user.password)
+
+
+def test_signup_is_a_single_insert(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    executed_statements: List[str],
+):
+    response = signup_user(client, create_random_user())
+
+    assert response.status_code == 201
+    assert len(executed_statements) == 1
+    assert executed_statements[0].startswith("INSERT")
+
+
+def test_fail_create_user_with_existing_name(
+    client: TestClient, create_random_user: RandomUserFunction, signup_user: SignupFunction
+):
+    user: CreateUserData = create_random_user()
+    user.name = "pepe"
+
+    response = signup_user(client, user)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with name: pepe already exists"
+
+
+def test_update_current_user_is_a_single_update(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+    executed_statements: List[str],
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+    new_name = get_random_user_name()
+    executed_statements.clear()
+
+    response = client.patch(
+        "/users/me", headers={"Authorization": f"Bearer {token}"}, json={"name": new_name}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == new_name
+    assert response.json()["email"] == user.email
+    assert len(executed_statements) == 2
+    assert executed_statements[1].startswith("UPDATE")
+    delete_user(client, token)
+
+
+def test_update_current_user_password(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+
+    response = client.patch(
+        "/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"password": "a-new-password"},
+    )
+
+    assert response.status_code == 200
+    token = test_login(client, login_user, username=user.email, password="a-new-password")
+    delete_user(client, token)
+
+
+def test_user_cannot_change_own_role(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+
+    response = client.patch(
+        "/users/me", headers={"Authorization": f"Bearer {token}"}, json={"role": "admin"}
+    )
+
+    assert response.status_code == 403
+    delete_user(client, token)
+
+
+def test_update_conflict_ignores_own_values(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+
+    response = client.patch(
+        "/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"name": user.name, "email": "pepe@example.com"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with email: pepe@example.com already exists"
+    delete_user(client, token)
+
+
+def test_admin_can_update_users(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+    listing = client.get(f"/users?name_prefix={user.name}", headers=headers).json()
+    user_id = listing["users"][0]["id"]
+
+    response = client.patch(f"/users/{user_id}", headers=headers, json={"role": "user"})
+    assert response.status_code == 200
+    assert response.json()["role"] == Role.USER
+
+    response = client.patch(f"/users/{user_id}", headers=headers, json={"name": "pepe"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with name: pepe already exists"
+
+    response = client.patch(f"/users/{uuid4()}", headers=headers, json={"role": "user"})
+    assert response.status_code == 404
+
+
+def test_delete_current_user_is_a_single_delete(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+    executed_statements: List[str],
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+    executed_statements.clear()
+
+    response = delete_user(client, token)
+
+    assert response.status_code == 204
+    assert len(executed_statements) == 2
+    assert executed_statements[1].startswith("DELETE")
+    assert delete_user(client, token).status_code == 401
+
+
+def test_admin_can_bulk_delete_users(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+):
+    prefix = get_random_user_name()
+    for index in range(3):
+        user = create_random_user()
+        user.name = f"{prefix}-{index}"
+        user.email = EmailStr(f"{prefix}-{index}@example.com")
+        signup_user(client, user)
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+
+    response = client.delete(
+        f"/users?name_prefix={prefix}&exclude_names={prefix}-0", headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["deleted"] == 2
+    listing = client.get(f"/users?name_prefix={prefix}", headers=headers).json()
+    assert [user["name"] for user in listing["users"]] == [f"{prefix}-0"]
+    assert client.delete("/users", headers=headers).status_code == 400
+
+
+@pytest.mark.parametrize("exclude_names", ["", "%20"])
+def test_bulk_delete_rejects_blank_exclusions(
+    client: TestClient, login_user: LoginFunction, exclude_names: str
+):
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+    users_before = client.get("/users", headers=headers).json()["users"]
+
+    response = client.delete(f"/users?exclude_names={exclude_names}", headers=headers)
+
+    assert response.status_code == 400
+    assert client.get("/users", headers=headers).json()["users"] == users_before
+
+
+def test_polling_me_with_etag(
+    client: TestClient,
+    create_random_user: RandomUserFunction,
+    signup_user: SignupFunction,
+    login_user: LoginFunction,
+    delete_user: DeleteFunction,
+):
+    user: CreateUserData = create_random_user()
+    signup_user(client, user)
+    token = test_login(client, login_user, username=user.email, password=user.password)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    etag = client.get("/users/me", headers=headers).headers["ETag"]
+    response = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    client.patch("/users/me", headers=headers, json={"name": get_random_user_name()})
+    response = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    delete_user(client, token)
+
+
+def test_polling_users_with_etag(client: TestClient, login_user: LoginFunction):
+    headers = {"Authorization": f"Bearer {test_login(client, login_user)}"}
+
+    etag = client.get("/users?name_prefix=pepe", headers=headers).headers["ETag"]
+    response = client.get("/users?name_prefix=pepe", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/users?limit=1", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
@@ -21,3 +21,38 @@ def test_hash_password(password):
 def test_verify_password(password):
     hashed_password = crypt.hash_password(password)
     assert crypt.verify_password(password, hashed_password)
+
+
+@pytest.fixture
+def bcrypt_rounds():
+    crypt.configure_pwd_context(5)
+    yield 5
+    crypt.configure_pwd_context()
+
+
+def test_calibrate_bcrypt_rounds_respects_minimum():
+    assert crypt.calibrate_bcrypt_rounds(0, min_rounds=6) == 6
+    assert crypt.MIN_BCRYPT_ROUNDS <= crypt.calibrate_bcrypt_rounds(50) <= crypt.MAX_BCRYPT_ROUNDS
+
+
+def test_verify_and_update_password_rehashes_stale_cost(password, bcrypt_rounds):
+    stale_hash = crypt.pwd_context.handler("bcrypt").using(rounds=4).hash(password)
+
+    passwords_match, new_hash = crypt.verify_and_update_password(password, stale_hash)
+
+    assert passwords_match
+    assert new_hash and new_hash.startswith(f"$2b$0{bcrypt_rounds}$")
+    assert crypt.verify_and_update_password(password, new_hash) == (True, None)
+
+
+def test_verify_and_update_password_keeps_costlier_hash(password, bcrypt_rounds):
+    costlier_hash = (
+        crypt.pwd_context.handler("bcrypt").using(rounds=bcrypt_rounds + 1).hash(password)
+    )
+
+    assert crypt.verify_and_update_password(password, costlier_hash) == (True, None)
+
+
+def test_verify_and_update_password_rejects_wrong_password(password, bcrypt_rounds):
+    hashed_password = crypt.hash_password(password)
+    assert crypt.verify_and_update_password(password + "x", hashed_password) == (False, None)
@@ -0,0 +1,17 @@
+from app.libs.responses.etag import compute_etag, etag_matches
+
+ETAG = compute_etag(b'{"name":"foo"}')
+
+
+def test_etag_is_strong_and_stable():
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert compute_etag(b'{"name":"foo"}') == ETAG
+    assert compute_etag(b'{"name":"bar"}') != ETAG
+
+
+def test_etag_matches():
+    assert etag_matches(ETAG, ETAG)
+    assert etag_matches(f'"other", W/{ETAG}', ETAG)
+    assert etag_matches("*", ETAG)
+    assert not etag_matches('"other"', ETAG)
+    assert not etag_matches(None, ETAG)
@@ -0,0 +1,64 @@
+import json
+from uuid import uuid4
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.libs.responses import fast_json
+from app.libs.responses.fast_json import (
+    FastJSONResponse,
+    init_json_response,
+    model_response,
+)
+from app.schemas.users import Role, User, UsersPage
+
+
+def user() -> User:
+    return User(id=uuid4(), name="foo", email="foo@example.com", role=Role.ADMIN)
+
+
+@pytest.fixture
+def json_response():
+    previous = fast_json.get_json_response()
+    yield
+    fast_json._response_class = previous  # pylint: disable=protected-access
+
+
+def test_renders_models_like_the_generic_encoder():
+    page = UsersPage(users=[user(), user()], next_cursor=None)
+
+    rendered = FastJSONResponse(page).body
+
+    assert json.loads(rendered) == jsonable_encoder(page)
+
+
+def test_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
+
+
+def test_model_response_with_stdlib_json(json_response):
+    served_user = user()
+    init_json_response(fast_json.STDLIB_JSON)
+
+    response = model_response(served_user, User, status_code=201)
+
+    assert not isinstance(response, FastJSONResponse)
+    assert response.status_code == 201
+    assert json.loads(response.body) == jsonable_encoder(served_user)
+
+
+class UserWithPassword(User):
+    password: str
+
+
+def test_model_response_rejects_wider_models():
+    wider_user = UserWithPassword(**user().dict(), password="secret")
+
+    with pytest.raises(TypeError):
+        model_response(wider_user, User)
+
+
+def test_unknown_json_response(json_response):
+    with pytest.raises(ValueError):
+        init_json_response("xml")
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.libs.crypt import crypt
+from app.libs.crypt.hasher import HasherBusyError, PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    password_hasher = PasswordHasher(workers=1, max_pending=2)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+def test_hash_and_verify_password(hasher: PasswordHasher):
+    async def _hash_and_verify():
+        hashed_password = await hasher.hash_password("secret")
+        return await hasher.verify_password("secret", hashed_password)
+
+    assert asyncio.run(_hash_and_verify())
+
+
+def test_rejects_when_queue_is_full(hasher: PasswordHasher):
+    async def _burst():
+        return await asyncio.gather(
+            *(hasher.hash_password("secret") for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(_burst())
+    assert sum(isinstance(result, HasherBusyError) for result in results) == 1
+    assert hasher.pending == 0
+
+
+def test_verify_is_not_stuck_behind_a_bulk_batch():
+    password_hasher = PasswordHasher(workers=1, bcrypt_rounds=6, bulk_chunk_size=4)
+
+    async def _verify_during_batch():
+        hashed_password = await password_hasher.hash_password("secret")
+        batch = asyncio.create_task(password_hasher.hash_passwords(["secret"] * 200))
+        await asyncio.sleep(0.05)
+
+        assert await password_hasher.verify_password("secret", hashed_password)
+        assert not batch.done()
+        assert len(await batch) == 200
+
+    try:
+        asyncio.run(_verify_during_batch())
+    finally:
+        password_hasher.shutdown()
+
+
+@pytest.mark.parametrize("workers, bulk_workers", [(1, 1), (2, 2), (4, 3)])
+def test_bulk_hashing_runs_in_parallel(monkeypatch, workers: int, bulk_workers: int):
+    password_hasher = PasswordHasher(workers=workers, bulk_chunk_size=1)
+    active, most_active = 0, 0
+    lock = threading.Lock()
+
+    def _hash_passwords(passwords):
+        nonlocal active, most_active
+        with lock:
+            active += 1
+            most_active = max(most_active, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return passwords
+
+    monkeypatch.setattr(crypt, "hash_passwords", _hash_passwords)
+    try:
+        asyncio.run(password_hasher.hash_passwords(["secret"] * 12))
+    finally:
+        password_hasher.shutdown()
+
+    assert password_hasher.bulk_workers == bulk_workers
+    assert most_active == bulk_workers
@@ -0,0 +1,42 @@
+import pytest
+
+from app.libs.metrics.registry import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_and_gauge():
+    counter = Counter("requests_total", "Requests", ("route",))
+    counter.inc(labels=("/users",))
+    counter.inc(2, labels=("/users",))
+    gauge = Gauge("in_flight", "In flight")
+    gauge.inc()
+    gauge.dec()
+
+    assert counter.samples() == ['requests_total{route="/users"} 3']
+    assert gauge.samples() == ["in_flight 0"]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value, ("/users/me",))
+
+    assert histogram.samples() == [
+        'latency_seconds_bucket{route="/users/me",le="0.1"} 2',
+        'latency_seconds_bucket{route="/users/me",le="1"} 3',
+        'latency_seconds_bucket{route="/users/me",le="+Inf"} 4',
+        'latency_seconds_sum{route="/users/me"} 2.65',
+        'latency_seconds_count{route="/users/me"} 4',
+    ]
+
+
+def test_registry_renders_the_exposition_format():
+    registry = Registry()
+    registry.register(Counter("errors_total", "Errors", ("detail",))).inc(labels=('say "hi"\n',))
+
+    assert registry.render() == (
+        "# HELP errors_total Errors\n"
+        "# TYPE errors_total counter\n"
+        'errors_total{detail="say \\"hi\\"\\n"} 1\n'
+    )
+    with pytest.raises(ValueError):
+        registry.register(Counter("errors_total", "Errors"))
@@ -0,0 +1,25 @@
+import os
+
+from app.libs.metrics.profiling import enforce_disk_cap, profile_name
+
+
+def test_profile_name():
+    name = profile_name("GET", "/users/{user_id}", 12.4)
+
+    assert name.endswith("-GET-users_user_id-12ms.pstats")
+
+
+def test_oldest_profiles_are_removed_over_the_cap(tmp_path):
+    for index in range(4):
+        path = tmp_path / f"{index}.pstats"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (index, index))
+    (tmp_path / "notes.txt").write_bytes(b"x" * 1000)
+
+    enforce_disk_cap(tmp_path, 250)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "2.pstats",
+        "3.pstats",
+        "notes.txt",
+    ]
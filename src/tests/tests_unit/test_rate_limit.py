@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from app.libs.rate_limit.buckets import MemoryBackend, RateLimiter, RedisBackend
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None  # type: ignore
+
+
+def take(backend: MemoryBackend, key: str = "key", capacity: int = 2, rate: float = 1) -> float:
+    return asyncio.run(backend.take(key, capacity, rate))
+
+
+def test_bucket_empties_and_refills():
+    backend = MemoryBackend()
+
+    assert take(backend) == 0
+    assert take(backend) == 0
+    assert take(backend, rate=100) == pytest.approx(0.01, rel=0.5)
+    time.sleep(0.02)
+    assert take(backend, rate=100) == 0
+
+
+def test_buckets_are_independent():
+    backend = MemoryBackend()
+    take(backend, capacity=1)
+
+    assert take(backend, capacity=1) > 0
+    assert take(backend, key="another-key", capacity=1) == 0
+
+
+def test_full_buckets_are_swept():
+    backend = MemoryBackend(sweep_interval=0)
+    take(backend, key="refilled", rate=1000)
+    take(backend, key="empty", capacity=1, rate=0.001)
+    time.sleep(0.01)
+    backend.sweep()
+
+    assert list(backend.buckets) == ["empty"]
+
+
+@pytest.mark.skipif(fakeredis is None, reason="Needs fakeredis with Lua support")
+def test_shared_bucket_empties_and_refills():
+    async def _take_from_redis():
+        backend = RedisBackend(client=fakeredis.FakeAsyncRedis())
+        waits = [await backend.take("key", 2, 10) for _ in range(3)]
+        ttl = await backend.client.pttl("rate-limit:key")
+        await asyncio.sleep(0.15)
+        waits.append(await backend.take("key", 2, 10))
+        waits.append(await backend.take("another-key", 1, 0.001))
+        waits.append(await backend.take("another-key", 1, 0.001))
+        await backend.close()
+        return waits, ttl
+
+    waits, ttl = asyncio.run(_take_from_redis())
+
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.1, rel=0.5)
+    assert waits[3] == 0
+    assert waits[4] == 0
+    assert waits[5] == pytest.approx(1000, rel=0.01)
+    assert 0 < ttl <= 201
+
+
+def test_disabled_limiter():
+    limiter = RateLimiter(MemoryBackend(), enabled=False)
+
+    waits = [asyncio.run(limiter.hit("scope", "key", 1, 60)) for _ in range(3)]
+
+    assert waits == [0, 0, 0]
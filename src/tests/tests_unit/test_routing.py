@@ -0,0 +1,71 @@
+import time
+
+import pytest
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.services.db_interface import insert_ignoring_conflicts
+from app.storage.models import DBUser
+from app.storage.routing import (
+    LEAST_CONNECTIONS,
+    Replicas,
+    RoutingSession,
+    parse_last_write,
+)
+
+
+def engines(count: int) -> list:
+    return [
+        create_async_engine(f"sqlite+aiosqlite:///replica-{index}.db") for index in range(count)
+    ]
+
+
+def test_round_robin():
+    first, second = engines(2)
+    replicas = Replicas([first, second])
+
+    assert [replicas.choose() for _ in range(4)] == [first, second, first, second]
+
+
+def test_least_connections(monkeypatch):
+    busy, idle = engines(2)
+    monkeypatch.setattr(busy.pool, "checkedout", lambda: 3)
+    replicas = Replicas([busy, idle], balancing=LEAST_CONNECTIONS)
+
+    assert replicas.choose() is idle
+
+
+def test_unknown_balancing():
+    with pytest.raises(ValueError):
+        Replicas(engines(1), balancing="random")
+
+
+def test_recent_writes_expire():
+    replicas = Replicas(engines(1), pin_seconds=5)
+
+    assert replicas.wrote_recently(time.time() - 1)
+    assert not replicas.wrote_recently(time.time() - 5)
+    assert not replicas.wrote_recently(None)
+
+
+def test_writes_from_the_future_do_not_pin():
+    replicas = Replicas(engines(1), pin_seconds=5)
+
+    assert not replicas.wrote_recently(time.time() + 3600)
+
+
+def test_last_write_cookie_parsing():
+    assert parse_last_write("1700000000.123") == 1700000000.123
+    assert parse_last_write("not-a-time") is None
+    assert parse_last_write(None) is None
+
+
+def test_conflict_handling_does_not_pick_a_replica(monkeypatch):
+    primary, replica = engines(2)
+    replicas = Replicas([replica])
+    monkeypatch.setattr(replicas, "choose", pytest.fail)
+    session = AsyncSession(
+        bind=primary, sync_session_class=RoutingSession, info={"replicas": replicas}
+    )
+
+    assert isinstance(insert_ignoring_conflicts(DBUser, session), sqlite.Insert)
@@ -0,0 +1,26 @@
+import multiprocessing
+
+from app import server
+from app.settings import settings
+
+
+def test_workers_default_to_the_cpu_count(monkeypatch):
+    monkeypatch.setattr(settings, "server_workers", None)
+
+    assert server.server_options()["workers"] == multiprocessing.cpu_count()
+
+
+def test_options_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "server_workers", 3)
+    monkeypatch.setattr(settings, "server_max_requests", 1000)
+
+    options = server.server_options()
+
+    assert options["workers"] == 3
+    assert options["max_requests"] == 1000
+    assert options["preload_app"] is settings.server_preload
+    assert options["worker_class"] is server.Worker
+
+
+def test_forwarded_headers_are_only_trusted_from_localhost():
+    assert server.server_options()["forwarded_allow_ips"] == "127.0.0.1"
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.libs.crypt.schemas import TokenData
+from app.libs.crypt.token_cache import TokenCache
+
+SECRET_KEY = "secret"
+
+
+def token_data(minutes: int = 5) -> TokenData:
+    return TokenData(id=uuid4(), exp=datetime.utcnow() + timedelta(minutes=minutes))
+
+
+@pytest.fixture
+def cache() -> TokenCache:
+    return TokenCache(max_size=2)
+
+
+def test_hit_and_miss(cache: TokenCache):
+    data = token_data()
+    assert cache.get("token", SECRET_KEY) is None
+
+    cache.set("token", SECRET_KEY, data)
+    assert cache.get("token", SECRET_KEY) == data
+    assert cache.statistics()["hits"] == 1
+    assert cache.statistics()["misses"] == 1
+
+
+def test_expired_tokens_are_evicted(cache: TokenCache):
+    cache.set("token", SECRET_KEY, token_data(minutes=-1))
+    assert cache.get("token", SECRET_KEY) is None
+    assert cache.statistics()["size"] == 0
+
+
+def test_least_recently_used_is_evicted(cache: TokenCache):
+    cache.set("first", SECRET_KEY, token_data())
+    cache.set("second", SECRET_KEY, token_data())
+    cache.get("first", SECRET_KEY)
+    cache.set("third", SECRET_KEY, token_data())
+
+    assert cache.get("second", SECRET_KEY) is None
+    assert cache.get("first", SECRET_KEY) is not None
+    assert cache.get("third", SECRET_KEY) is not None
+
+
+def test_rotating_secret_key_clears_cache(cache: TokenCache):
+    cache.set("token", SECRET_KEY, token_data())
+    assert cache.get("token", "rotated-secret") is None
+    assert cache.get("token", SECRET_KEY) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TokenCache(max_size=0)
+    cache.set("token", SECRET_KEY, token_data())
+    assert cache.get("token", SECRET_KEY) is None